@@ -0,0 +1,311 @@
+"""
+Serviço HTTP local e assíncrono (asyncio da biblioteca padrão, sem framework
+web) sobre o núcleo de cálculo `calculo_bitola`.
+
+Rotas:
+    GET  /saude     -> {"status": "ok"}
+    POST /calcular  -> um esquema: {"reducoes": [30, 28, ...], "valor_inicial": 5.5,
+                       "grandeza": "diametro" | "area", "fio_redondo": true}
+    POST /lote      -> vários esquemas: {"grandeza": "diametro",
+                       "esquemas": [{"reducoes": [...], "valor_inicial": 5.5}, ...]}
+
+As respostas são JSON; com `?formato=csv` (ou `Accept: text/csv`) vêm em CSV,
+nas colunas do arquivo exportado pelo aplicativo. Conexões são mantidas abertas
+(keep-alive) e lotes grandes são calculados em uma thread auxiliar para não
+bloquear as demais requisições. O pandas só é carregado nas respostas em CSV.
+Corpos com Content-Length inválido recebem 400 e acima de
+`TAMANHO_MAXIMO_CORPO`, 413; cabeçalhos além de `MAX_CABECALHOS` linhas ou
+`TAMANHO_MAXIMO_CABECALHOS` bytes recebem 431. Erros internos respondem 500
+com uma mensagem genérica (o detalhe vai para o stderr do servidor).
+
+Exemplo:
+    python api_http.py --host 127.0.0.1 --porta 8080
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import traceback
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from calculo_bitola import (
+    GRANDEZA_AREA,
+    GRANDEZA_DIAMETRO,
+    calcular_lote,
+    converter_fio_redondo,
+    tabela_evolucao,
+    tabela_lote,
+)
+
+# Lotes a partir deste número de esquemas são calculados fora do laço de eventos
+LIMITE_LOTE_SINCRONO = 256
+TAMANHO_MAXIMO_CORPO = 64 * 1024 * 1024
+# Limites da linha de requisição e dos cabeçalhos (também o limite de linha do StreamReader)
+TAMANHO_MAXIMO_CABECALHOS = 32 * 1024
+MAX_CABECALHOS = 100
+
+MOTIVOS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+
+class ErroRequisicao(Exception):
+    """Erro de validação que vira uma resposta 4xx."""
+
+    def __init__(self, mensagem, status=400):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def _lista(valores):
+    """Array → lista JSON, com NaN como null."""
+    return [None if math.isnan(v) else v for v in np.asarray(valores, dtype=np.float64).tolist()]
+
+
+def _grandeza(dados):
+    nome = str(dados.get("grandeza", "diametro")).lower()
+    if nome in ("area", "área", GRANDEZA_AREA.lower()):
+        return GRANDEZA_AREA
+    if nome in ("diametro", "diâmetro", GRANDEZA_DIAMETRO.lower()):
+        return GRANDEZA_DIAMETRO
+    raise ErroRequisicao(f"Grandeza desconhecida: {nome!r}.")
+
+
+def _valor_inicial(esquema):
+    """Valor inicial do esquema (número) ou None; ErroRequisicao para outros tipos."""
+    valor = esquema.get("valor_inicial")
+    if valor is not None and (isinstance(valor, bool) or not isinstance(valor, (int, float))):
+        raise ErroRequisicao("Campo 'valor_inicial' deve ser um número.")
+    return valor
+
+
+def _id(esquema, padrao):
+    ident = esquema.get("id", padrao)
+    if isinstance(ident, bool) or not isinstance(ident, (str, int, float)):
+        raise ErroRequisicao("Campo 'id' deve ser um texto ou um número.")
+    return ident
+
+
+def _reducoes(esquema):
+    if not isinstance(esquema, dict):
+        raise ErroRequisicao("Cada esquema deve ser um objeto JSON.")
+    reducoes = esquema.get("reducoes")
+    if not isinstance(reducoes, list):
+        raise ErroRequisicao("Campo 'reducoes' deve ser uma lista de porcentagens.")
+    return reducoes
+
+
+def calcular_um(dados, csv=False):
+    """Resposta de /calcular: resumo, tabela por passe e conversão para fio redondo."""
+    grandeza = _grandeza(dados)
+    try:
+        resultado = calcular_lote([_reducoes(dados)], _valor_inicial(dados))
+    except (TypeError, ValueError) as erro:
+        raise ErroRequisicao(str(erro)) from None
+    if csv:
+        return tabela_evolucao(resultado, grandeza).to_csv(index=False)
+
+    # JSON montado direto dos arrays (sem DataFrame), com a linha "Inicial" se houver valor
+    v0 = resultado.valores_iniciais[0]
+    tem_valor = not math.isnan(v0)
+    inicial = (["Inicial"], [np.nan], [0.0], [1.0], [v0]) if tem_valor else ([], [], [], [], [])
+    valores = np.concatenate((inicial[4], resultado.valores[0]))
+    resposta = {
+        "grandeza": grandeza,
+        "reducao_total_pct": float(resultado.reducao_total_pct[0]),
+        "fator_restante": float(resultado.fator_total[0]),
+        "valor_final": _lista(resultado.valores_finais)[0],
+        "passes": {
+            "passe": inicial[0] + list(range(1, resultado.num_passes + 1)),
+            "reducao_entre_pct": _lista(np.concatenate((inicial[1], resultado.reducoes_pct[0]))),
+            "reducao_acumulada_pct": _lista(np.concatenate((inicial[2], resultado.reducao_acum_pct[0]))),
+            "fator_restante": _lista(np.concatenate((inicial[3], resultado.fator_restante[0]))),
+            "valor": _lista(valores),
+        },
+    }
+    if dados.get("fio_redondo", True) and tem_valor:
+        col_convertida, convertidos = converter_fio_redondo(valores, grandeza)
+        resposta["conversao"] = {"grandeza": col_convertida, "valores": _lista(convertidos)}
+    return resposta
+
+
+def calcular_varios(dados, csv=False):
+    """Resposta de /lote: resumo por esquema (JSON) ou tabela longa de todos os passes (CSV)."""
+    grandeza = _grandeza(dados)
+    esquemas = dados.get("esquemas")
+    if not isinstance(esquemas, list) or not esquemas:
+        raise ErroRequisicao("Campo 'esquemas' deve ser uma lista não vazia.")
+
+    listas = [_reducoes(e) for e in esquemas]
+    valores_iniciais = [_valor_inicial(e) for e in esquemas]
+    ids = [_id(e, i) for i, e in enumerate(esquemas, start=1)]
+    num_passes = np.array([len(r) for r in listas])
+    red = np.zeros((len(listas), num_passes.max()))
+    try:
+        for i, r in enumerate(listas):
+            red[i, :len(r)] = r
+        v0 = np.array([np.nan if v is None else v for v in valores_iniciais], dtype=np.float64)
+        resultado = calcular_lote(red, v0)
+    except (TypeError, ValueError) as erro:
+        raise ErroRequisicao(str(erro)) from None
+
+    if csv:
+        tabela = tabela_lote(resultado, grandeza, ids=ids, num_passes=num_passes)
+        return tabela.to_csv(index=False)
+
+    # Reduções nulas após o fim do esquema não alteram os totais
+    return {
+        "grandeza": grandeza,
+        "reducao_total_pct": _lista(resultado.reducao_total_pct),
+        "fator_restante": _lista(resultado.fator_total),
+        "valor_final": _lista(resultado.valores_finais),
+    }
+
+
+ROTAS = {"/calcular": calcular_um, "/lote": calcular_varios}
+
+
+def _resposta(status, corpo, tipo, manter):
+    conteudo = corpo.encode("utf-8")
+    cabecalho = (
+        f"HTTP/1.1 {status} {MOTIVOS.get(status, '')}\r\n"
+        f"Content-Type: {tipo}; charset=utf-8\r\n"
+        f"Content-Length: {len(conteudo)}\r\n"
+        f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n"
+    )
+    return cabecalho.encode("latin-1") + conteudo
+
+
+def _json(status, dados, manter):
+    return _resposta(status, json.dumps(dados, ensure_ascii=False), "application/json", manter)
+
+
+async def _atender(metodo, alvo, cabecalhos, corpo):
+    """Despacha uma requisição e devolve (status, corpo, tipo)."""
+    url = urlsplit(alvo)
+    if url.path == "/saude":
+        return 200, json.dumps({"status": "ok"}), "application/json"
+    funcao = ROTAS.get(url.path)
+    if funcao is None:
+        raise ErroRequisicao("Rota inexistente.", 404)
+    if metodo != "POST":
+        raise ErroRequisicao("Use POST.", 405)
+
+    formato = parse_qs(url.query).get("formato", [""])[0]
+    csv = formato == "csv" or (not formato and "text/csv" in cabecalhos.get("accept", ""))
+    try:
+        dados = json.loads(corpo or b"{}")
+    except ValueError:
+        raise ErroRequisicao("Corpo JSON inválido.") from None
+    if not isinstance(dados, dict):
+        raise ErroRequisicao("O corpo deve ser um objeto JSON.")
+
+    esquemas = dados.get("esquemas")
+    if isinstance(esquemas, list) and len(esquemas) >= LIMITE_LOTE_SINCRONO:
+        saida = await asyncio.get_running_loop().run_in_executor(None, funcao, dados, csv)
+    else:
+        saida = funcao(dados, csv)
+    if csv:
+        return 200, saida, "text/csv"
+    return 200, json.dumps(saida, ensure_ascii=False), "application/json"
+
+
+async def _ler_requisicao(leitor):
+    """
+    Linha de requisição, cabeçalhos e corpo: (metodo, alvo, versao, cabecalhos, corpo),
+    ou None no fim da conexão. ErroRequisicao se malformada ou acima dos limites.
+    """
+    try:
+        linha = await leitor.readline()
+    except ValueError:  # linha maior que o limite do StreamReader
+        raise ErroRequisicao("Linha de requisição muito longa.") from None
+    if not linha:
+        return None
+    try:
+        metodo, alvo, versao = linha.decode("latin-1").split()
+    except ValueError:
+        raise ErroRequisicao("Requisição malformada.") from None
+
+    cabecalhos = {}
+    num_linhas = tamanho_cabecalhos = 0
+    while True:
+        try:
+            linha = await leitor.readline()
+        except ValueError:
+            raise ErroRequisicao("Cabeçalho muito grande.", 431) from None
+        if linha in (b"\r\n", b"\n", b""):
+            break
+        num_linhas += 1
+        tamanho_cabecalhos += len(linha)
+        if num_linhas > MAX_CABECALHOS or tamanho_cabecalhos > TAMANHO_MAXIMO_CABECALHOS:
+            raise ErroRequisicao("Cabeçalhos demais ou muito grandes.", 431)
+        nome, _, valor = linha.decode("latin-1").partition(":")
+        cabecalhos[nome.strip().lower()] = valor.strip()
+
+    try:
+        tamanho = int(cabecalhos.get("content-length") or 0)
+    except ValueError:
+        tamanho = -1
+    if tamanho < 0:
+        raise ErroRequisicao("Content-Length inválido.")
+    if tamanho > TAMANHO_MAXIMO_CORPO:
+        raise ErroRequisicao("Corpo muito grande.", 413)
+    corpo = await leitor.readexactly(tamanho) if tamanho else b""
+    return metodo, alvo, versao, cabecalhos, corpo
+
+
+async def tratar_conexao(leitor, escritor):
+    """Atende requisições HTTP/1.1 em sequência na mesma conexão."""
+    try:
+        while True:
+            try:
+                requisicao = await _ler_requisicao(leitor)
+            except ErroRequisicao as erro:
+                # sem saber onde a requisição termina, não há como seguir na conexão: responde e fecha
+                escritor.write(_json(erro.status, {"erro": str(erro)}, False))
+                await escritor.drain()
+                break
+            if requisicao is None:
+                break
+            metodo, alvo, versao, cabecalhos, corpo = requisicao
+            manter = cabecalhos.get("connection", "").lower() != "close" and versao == "HTTP/1.1"
+
+            try:
+                status, saida, tipo = await _atender(metodo, alvo, cabecalhos, corpo)
+                escritor.write(_resposta(status, saida, tipo, manter))
+            except ErroRequisicao as erro:
+                escritor.write(_json(erro.status, {"erro": str(erro)}, manter))
+            except Exception:  # não derruba a conexão por um erro inesperado nem expõe detalhes internos
+                traceback.print_exc()
+                escritor.write(_json(500, {"erro": "Erro interno do servidor."}, manter))
+            await escritor.drain()
+            if not manter:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        escritor.close()
+
+
+async def servir(host="127.0.0.1", porta=8080):
+    servidor = await asyncio.start_server(tratar_conexao, host, porta, backlog=1024, limit=TAMANHO_MAXIMO_CABECALHOS)
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP local da calculadora de redução de bitola.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8080)
+    args = parser.parse_args(argv)
+    print(f"Servindo em http://{args.host}:{args.porta}")
+    try:
+        asyncio.run(servir(args.host, args.porta))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,164 +1,675 @@
 
-import math
-import pandas as pd
 import streamlit as st
 
-# Configuração da página
-st.set_page_config(page_title="Calculadora de Redução de Bitola (até 13 passes)", layout="centered")
-st.title("Calculadora de Redução de Bitola — até 13 passes")
+# Configuração da página — antes dos demais imports, para que a primeira renderização
+# não espere o carregamento do pandas e dos módulos de cálculo
+st.set_page_config(page_title="Calculadora de Redução de Bitola", layout="centered")
+st.title("Calculadora de Redução de Bitola")
 
 st.markdown(
     """
-    Informe as reduções **percentuais por passe** (até 13) e, opcionalmente, o valor inicial de **diâmetro (mm)** ou **área (mm²)**.
+    Informe as reduções **percentuais por passe** (quantos passes quiser; é possível colar uma coluna de planilha)
+    e, opcionalmente, o valor inicial de **diâmetro (mm)** ou **área (mm²)**.
     O aplicativo calcula a **redução acumulada**, o **valor final** e mostra a **evolução por passe**.
     Também exibe explicitamente a **redução entre passes (%)** e a **redução acumulada por passe (%)**.
     """
 )
 
-# Escolha da grandeza principal
-col_a, col_b = st.columns(2)
-with col_a:
-    grandeza = st.selectbox("Grandeza principal", ["Diâmetro (mm)", "Área (mm²)"])
-with col_b:
-    eh_redondo = st.checkbox("Fio redondo (converter entre diâmetro e área)", value=True)
+import io  # noqa: E402
 
-# Valor inicial (opcional)
-if grandeza == "Diâmetro (mm)":
-    valor_inicial = st.number_input("Diâmetro inicial (mm) — opcional", min_value=0.0, format="%.6f")
-else:
-    valor_inicial = st.number_input("Área inicial (mm²) — opcional", min_value=0.0, format="%.6f")
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from cache_persistente import cache_global, chave_canonica  # noqa: E402
+from calculo_bitola import (  # noqa: E402
+    COL_FATOR,
+    COL_RED_ACUM,
+    COL_RED_ENTRE,
+    GRANDEZA_AREA,
+    GRANDEZA_DIAMETRO,
+    GRANDEZAS,
+    calcular_esquema,
+    converter_fio_redondo,
+    eh_decrescente,
+    tabela_evolucao,
+)
+from comparacao import (  # noqa: E402
+    SERIE_VALOR,
+    SERIES,
+    calcular_esquemas,
+    listar_esquemas,
+    resumo_esquemas,
+    spec_grafico,
+)
+from entrada_esquema import reducoes_de_arquivo, reducoes_de_texto  # noqa: E402
+from esforcos import MATERIAIS, calcular_esforcos  # noqa: E402
+from esquema_incremental import EsquemaIncremental  # noqa: E402
+from fieiras import CatalogoFieiras  # noqa: E402
+from instrumentacao import Cronometro  # noqa: E402
+from monte_carlo import simular  # noqa: E402
+from otimizador import OBJETIVOS, otimizar_esquema  # noqa: E402
+from projeto_inverso import (  # noqa: E402
+    AFUNILAMENTOS_PADRAO,
+    CAMINHO_GRADE_PADRAO,
+    GradeProjeto,
+    projetar,
+    tabela_projeto,
+)
+from relatorios import DESCONHECIDO, FORMATOS, GERANDO, PRONTO, TIPOS_MIME, GeradorRelatorios  # noqa: E402
+from simulador_linha import Linha, regime_linha, simular_linhas, tabela_resultados  # noqa: E402
+
+# Tamanho máximo de cada cache (entradas mais antigas são descartadas)
+MAX_ENTRADAS_CACHE = 256
+
+# Tabela de entrada das reduções
+COL_ENTRADA = "Redução (%)"
+PASSES_PADRAO = 5
+
+# Casas exibidas nas tabelas por passe (só na tela: CSV e API mantêm a precisão completa)
+FORMATO_EXIBICAO = {COL_RED_ENTRE: "%.3f", COL_RED_ACUM: "%.3f", COL_FATOR: "%.6f"}
+
+
+def colunas_exibicao(df):
+    """Configuração das colunas numéricas de uma tabela por passe para o st.dataframe."""
+    return {c: st.column_config.NumberColumn(c, format=FORMATO_EXIBICAO.get(c, "%.6f"))
+            for c in df.columns if c != "Passe"}
+
+
+def normalizar_entradas(grandeza, valor_inicial, reducoes_pct):
+    """Chave canônica das entradas: valor ausente/não positivo vira 0.0 e reduções viram tupla de floats."""
+    valor = float(valor_inicial) if valor_inicial and valor_inicial > 0 else 0.0
+    return grandeza, valor, tuple(float(r) for r in reducoes_pct)
 
-# Número de passes
-num_passes = st.number_input("Quantos passes?", min_value=1, max_value=13, value=5)
 
-# Entradas de redução por passe
-st.markdown("### Reduções por passe (%)")
-reducoes_pct = []   # porcentagens informadas por passe (ex.: 30, 28...)
-reducoes_frac = []  # frações (0–1) correspondentes (ex.: 0.30, 0.28...)
-for i in range(1, int(num_passes) + 1):
-    r_pct = st.number_input(f"Passe {i}", min_value=0.0, max_value=100.0, value=0.0, step=0.1, format="%.3f")
-    reducoes_pct.append(r_pct)
-    reducoes_frac.append(r_pct / 100.0)
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE, show_spinner=False)
+def calcular_cache(grandeza, valor_inicial, reducoes):
+    return calcular_esquema(reducoes, valor_inicial or None)
+
+
+def tabela_conversao(df, grandeza):
+    """Conversão da grandeza principal para fio redondo (área ↔ diâmetro), passe a passe."""
+    valor_col = GRANDEZA_AREA if grandeza == GRANDEZA_AREA else GRANDEZA_DIAMETRO
+    col_convertida, convertidos = converter_fio_redondo(df[valor_col].to_numpy(dtype=float), grandeza)
+    return pd.DataFrame({"Passe": df["Passe"], col_convertida: convertidos})
+
+
+def tabela_compartilhada(grandeza, valor_inicial, reducoes):
+    """
+    Tabela por passe compartilhada entre sessões, usuários e reinícios
+    (memória do processo + SQLite local). O objeto devolvido é compartilhado:
+    copie antes de alterar.
+    """
+    def montar():
+        return tabela_evolucao(calcular_esquema(reducoes, valor_inicial or None), grandeza)
+
+    return cache_global().obter_ou_calcular(chave_canonica(grandeza, valor_inicial, reducoes), montar)
+
+
+def graficos_de_tabela(df, grandeza, df_conv=None):
+    """
+    Séries indexadas por passe para os gráficos de evolução, redução e
+    conversão, tiradas da tabela da sessão (já atualizada de forma incremental)
+    e da sua conversão para fio redondo (None sem valor inicial).
+    """
+    valor_col = GRANDEZA_AREA if grandeza == GRANDEZA_AREA else GRANDEZA_DIAMETRO
+    graficos = {"reducao": df.dropna(subset=[COL_RED_ENTRE]).set_index("Passe")[COL_RED_ENTRE]}
+    if df_conv is not None:
+        graficos["evolucao"] = df.set_index("Passe")[valor_col]
+        graficos["conversao"] = df_conv.set_index("Passe")[df_conv.columns[1]]
+    return graficos
+
+
+@st.cache_data(max_entries=32, show_spinner="Simulando bobinas...")
+def monte_carlo_cache(grandeza, valor_inicial, reducoes, desvio_fio, desvio_fieira, desgaste_max, num_amostras):
+    return simular(reducoes, valor_inicial, grandeza, desvio_fio=desvio_fio, desvio_fieira=desvio_fieira,
+                   desgaste_max=desgaste_max, num_amostras=num_amostras, semente=0)
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE, show_spinner=False)
+def esforcos_cache(grandeza, valor_inicial, reducoes, nome_material, angulo_graus, atrito, velocidade_final):
+    return calcular_esforcos([reducoes], valor_inicial, grandeza, MATERIAIS[nome_material],
+                             angulo_graus=angulo_graus, atrito=atrito, velocidade_final=velocidade_final)
+
+
+@st.cache_data(max_entries=32, show_spinner="Simulando a produção...")
+def simular_linhas_cache(grandeza, valor_inicial, reducoes, num_linhas, dias, equipes, nome_material, **parametros):
+    """Regime da linha e resumo da simulação de `num_linhas` linhas iguais (falhas independentes)."""
+    material = MATERIAIS[nome_material] if nome_material else None
+    linhas = [Linha(f"Linha {i + 1}", reducoes, valor_inicial, grandeza, material=material, **parametros)
+              for i in range(num_linhas)]
+    resultados = simular_linhas(linhas, horas=dias * 24.0, equipes=equipes, semente=0)
+    return regime_linha(linhas[0]), tabela_resultados(resultados)
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def carregar_catalogo_cache(conteudo):
+    return CatalogoFieiras.de_csv(io.BytesIO(conteudo))
+
+
+@st.cache_data(max_entries=32, show_spinner="Calculando esquemas...")
+def comparacao_cache(conteudo, grandeza, serie):
+    """Resumo por esquema e especificação do gráfico combinado (já reduzida) de um arquivo de esquemas."""
+    ids, resultado, num_passes = calcular_esquemas(pd.read_csv(io.BytesIO(conteudo)))
+    rotulo = (GRANDEZA_AREA if grandeza == GRANDEZA_AREA else GRANDEZA_DIAMETRO) if serie == SERIE_VALOR else None
+    return resumo_esquemas(ids, resultado, num_passes), spec_grafico(ids, resultado, num_passes, serie, rotulo)
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE, show_spinner=False)
+def otimizar_cache(*args, **kwargs):
+    return otimizar_esquema(*args, **kwargs)
+
+
+@st.cache_resource(show_spinner=False)
+def grade_projeto_cache():
+    """Grade pré-calculada do projeto inverso; a falha ao abrir propaga e não fica em cache."""
+    return GradeProjeto(CAMINHO_GRADE_PADRAO)
+
+
+def grade_projeto():
+    """Grade pré-calculada, se já gerada (python projeto_inverso.py); None enquanto não estiver disponível."""
+    try:
+        return grade_projeto_cache()
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE, show_spinner=False)
+def projetar_cache(valor_inicial, valor_alvo, num_passes, afunilamento):
+    """Reduções do projeto inverso e se vieram da grade pré-calculada."""
+    grade = grade_projeto()
+    reducoes = grade.consultar(valor_inicial, valor_alvo, num_passes, afunilamento) if grade is not None else None
+    if reducoes is not None:
+        return reducoes, True
+    return projetar(valor_inicial, valor_alvo, num_passes, afunilamento), False
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE, show_spinner=False)
+def tabela_projeto_cache(valor_inicial, valor_alvo):
+    """Tabela completa de projeto do par (inicial, alvo) e seu CSV; fatia da grade quando disponível."""
+    grade = grade_projeto()
+    if grade is not None and grade.contem(valor_inicial, valor_alvo):
+        df = tabela_projeto(valor_inicial, valor_alvo, grade.passes, grade.afunilamentos,
+                            primeiras=grade.primeiras_reducoes(valor_inicial, valor_alvo))
+    else:
+        df = tabela_projeto(valor_inicial, valor_alvo)
+    return df, df.to_csv(index=False).encode("utf-8")
+
+
+@st.cache_resource(show_spinner=False)
+def gerador_relatorios():
+    """Pool de geração de relatórios compartilhado por todas as sessões."""
+    return GeradorRelatorios(processos=2)
+
+
+@st.fragment(run_every=1.0)
+def acompanhar_relatorio(chave_relatorio):
+    """Barra de andamento atualizada a cada segundo; recarrega a página quando o relatório termina."""
+    andamento = gerador_relatorios().estado(chave_relatorio)
+    if andamento.estado != GERANDO:
+        st.rerun()
+    st.progress(andamento.feitos / max(andamento.total, 1),
+                text=f"Gerando relatório: {andamento.feitos} de {andamento.total} esquemas")
+
+
+# Instrumentação opcional: tempos por etapa desta execução, com histórico na sessão
+cron = Cronometro(
+    ativo=st.sidebar.checkbox("Medir tempos por etapa", key="instrumentacao"),
+    historico=st.session_state.setdefault("tempos_etapas", {}),
+)
+
+
+def esquema_sessao(grandeza, valor_inicial, reducoes):
+    """
+    Esquema incremental e tabela por passe guardados na sessão. Em uma sessão
+    nova, ou quando mudam o número de passes, a grandeza ou o valor inicial, a
+    tabela vem do cache compartilhado entre sessões. Quando só algumas reduções
+    mudam, cada passe alterado é atualizado na árvore em O(log n) e apenas as
+    linhas a partir do primeiro passe alterado são recalculadas na tabela.
+    Os derivados da tabela (ver `derivado_sessao`) são descartados sempre que
+    ela muda.
+    """
+    estado = st.session_state.get("esquema_incremental")
+    if (estado is None or estado["grandeza"] != grandeza or estado["valor_inicial"] != valor_inicial
+            or len(estado["esquema"]) != len(reducoes)):
+        esquema = EsquemaIncremental(reducoes, valor_inicial)
+        df = tabela_compartilhada(grandeza, valor_inicial, reducoes).copy()
+        st.session_state["esquema_incremental"] = {
+            "grandeza": grandeza, "valor_inicial": valor_inicial, "esquema": esquema, "df": df, "derivados": {},
+        }
+        return esquema, df
+
+    reducoes = np.asarray(reducoes, dtype=np.float64)
+
+    esquema, df = estado["esquema"], estado["df"]
+    alterados = np.flatnonzero(esquema.reducoes_pct != reducoes)
+    if alterados.size:
+        estado["derivados"] = {}
+        for i in alterados:
+            esquema.alterar(i + 1, reducoes[i])
+        primeiro = int(alterados[0]) + 1
+        log_fator = esquema.acumulados_desde(primeiro)
+        linhas = slice((1 if esquema.valor_inicial else 0) + primeiro - 1, None)
+        valor_col = GRANDEZA_AREA if grandeza == GRANDEZA_AREA else GRANDEZA_DIAMETRO
+        df.iloc[linhas, df.columns.get_loc(COL_RED_ENTRE)] = reducoes[primeiro - 1:]
+        df.iloc[linhas, df.columns.get_loc(COL_RED_ACUM)] = 0.0 - np.expm1(log_fator) * 100.0
+        df.iloc[linhas, df.columns.get_loc(COL_FATOR)] = np.exp(log_fator)
+        if esquema.valor_inicial:
+            df.iloc[linhas, df.columns.get_loc(valor_col)] = esquema.valor_inicial * np.exp(log_fator)
+    return esquema, df
+
+
+def derivado_sessao(nome, montar):
+    """
+    Artefato derivado da tabela da sessão (conversão, séries dos gráficos, CSV),
+    montado uma única vez enquanto as entradas normalizadas não mudam.
+    """
+    derivados = st.session_state["esquema_incremental"]["derivados"]
+    if nome not in derivados:
+        derivados[nome] = montar()
+    return derivados[nome]
+
+
+def aplicar_reducoes(reducoes):
+    """Substitui o conteúdo do editor de reduções por um esquema inteiro (antes de o editor ser criado)."""
+    st.session_state["reducoes_base"] = [float(r) for r in reducoes]
+    st.session_state.pop("editor_reducoes", None)
+
+
+with cron.etapa("entradas"):
+    # Esquema inteiro colado ou carregado de arquivo, lido de uma vez
+    with st.expander("Colar ou carregar um esquema inteiro"):
+        texto_reducoes = st.text_area(
+            "Reduções (%) — uma por linha, ou separadas por ; ou tabulação (vírgula decimal aceita)",
+            key="texto_reducoes",
+        )
+        arquivo_reducoes = st.file_uploader("Ou um arquivo CSV, TXT ou Excel", type=["csv", "txt", "xlsx"],
+                                            key="arquivo_reducoes")
+        if st.button("Usar este esquema"):
+            try:
+                if arquivo_reducoes is not None:
+                    colado = reducoes_de_arquivo(arquivo_reducoes.name, arquivo_reducoes.getvalue())
+                else:
+                    colado = reducoes_de_texto(texto_reducoes)
+            except ValueError as erro:
+                st.error(str(erro))
+            else:
+                aplicar_reducoes(colado)
+                st.success(f"{len(colado)} passes carregados.")
+
+    # Em modo formulário, as entradas são enviadas juntas: uma única execução por confirmação
+    em_formulario = st.sidebar.checkbox("Calcular só ao confirmar (formulário)", value=True, key="modo_formulario")
+    entradas = st.form("form_entradas", border=False) if em_formulario else st.container()
+    with entradas:
+        # Escolha da grandeza principal
+        col_a, col_b = st.columns(2)
+        with col_a:
+            grandeza = st.selectbox("Grandeza principal", GRANDEZAS)
+        with col_b:
+            eh_redondo = st.checkbox("Fio redondo (converter entre diâmetro e área)", value=True)
+
+        # Valor inicial (opcional); no formulário a grandeza só muda ao confirmar
+        if em_formulario:
+            valor_inicial = st.number_input("Valor inicial (mm ou mm², conforme a grandeza) — opcional",
+                                            min_value=0.0, format="%.6f")
+        elif grandeza == GRANDEZA_DIAMETRO:
+            valor_inicial = st.number_input("Diâmetro inicial (mm) — opcional", min_value=0.0, format="%.6f")
+        else:
+            valor_inicial = st.number_input("Área inicial (mm²) — opcional", min_value=0.0, format="%.6f")
+
+        # Entradas de redução por passe: uma única tabela editável (uma linha por passe),
+        # sem limite de passes e com suporte a colar valores de planilhas
+        st.markdown("### Reduções por passe (%)")
+        df_entrada = st.data_editor(
+            pd.DataFrame({COL_ENTRADA: st.session_state.get("reducoes_base", [0.0] * PASSES_PADRAO)}),
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                COL_ENTRADA: st.column_config.NumberColumn(
+                    COL_ENTRADA, min_value=0.0, max_value=100.0, step=0.001, format="%.3f", default=0.0,
+                ),
+            },
+            key="editor_reducoes",
+        )
+        if em_formulario:
+            st.form_submit_button("Calcular", type="primary")
+    # porcentagens informadas por passe (ex.: 30, 28...); linhas vazias são ignoradas
+    reducoes_pct = df_entrada[COL_ENTRADA].dropna().to_numpy(dtype=float)
+    st.caption(f"{len(reducoes_pct)} passes informados.")
 
 # Checagem de reduções decrescentes (r1 >= r2 >= r3 ...)
-if len(reducoes_pct) > 1:
-    decrescente = all(reducoes_pct[i] >= reducoes_pct[i + 1] for i in range(len(reducoes_pct) - 1))
-else:
-    decrescente = True
+decrescente = bool(eh_decrescente(reducoes_pct)[0])
 
 if decrescente:
     st.success("Sequência de reduções: **decrescente** (r₁ ≥ r₂ ≥ r₃ …)")
 else:
     st.warning("Sequência de reduções: **não decrescente**. Existem passes com redução maior que o anterior.")
 
-# Fator acumulado total e redução total
-fator_restante_total = 1.0
-fatores_acum = []  # fator restante após cada passe
-for r in reducoes_frac:
-    fator_restante_total *= (1.0 - r)
-    fatores_acum.append(fator_restante_total)
-
-reducao_total_pct = (1.0 - fator_restante_total) * 100.0
+# Cálculo (fator acumulado, redução acumulada e valores por passe): a tabela principal
+# é atualizada de forma incremental e os gráficos saem dela; as demais etapas são
+# memorizadas pelas entradas normalizadas
+with cron.etapa("calculo"):
+    chave = normalizar_entradas(grandeza, valor_inicial, reducoes_pct)
+    esquema, df = esquema_sessao(*chave)
+    df_conv = derivado_sessao("conversao", lambda: tabela_conversao(df, grandeza)) if chave[1] > 0 else None
+    graficos = derivado_sessao("graficos", lambda: graficos_de_tabela(df, grandeza, df_conv))
+    fator_restante_total = esquema.fator_total
+    reducao_total_pct = esquema.reducao_total_pct
 
 # Resultados principais
-st.markdown("### Resultado acumulado")
-st.metric("Redução total (%)", f"{reducao_total_pct:.3f}%")
-st.metric("Fator restante", f"{fator_restante_total:.6f}")
-
-# Construção da tabela por passe
-linhas = []
-valor_col = "Diâmetro (mm)" if grandeza == "Diâmetro (mm)" else "Área (mm²)"
-valor_atual = valor_inicial if (valor_inicial and valor_inicial > 0) else None
-
-# Linha inicial, se houver valor
-if valor_atual is not None:
-    linhas.append({
-        "Passe": "Inicial",
-        "Redução entre passes (%)": None,
-        "Redução acumulada (%)": 0.0,
-        "Fator restante": 1.0,
-        valor_col: valor_atual
-    })
-
-# Iteração dos passes
-fator_acum = 1.0
-for idx, r_frac in enumerate(reducoes_frac, start=1):
-    # Fator do passe
-    fator = (1.0 - r_frac)
-    # Atualiza fator acumulado
-    fator_acum *= fator
-
-    # Valor após o passe (se houver valor inicial)
-    if valor_atual is not None:
-        valor_atual = valor_atual * fator
-
-    # Redução entre passes (%) é exatamente o valor informado
-    reducao_entre_pct = reducoes_pct[idx - 1]
-
-    # Redução acumulada (%) até este passe
-    reducao_acum_pct = (1.0 - fator_acum) * 100.0
-
-    linha = {
-        "Passe": idx,
-        "Redução entre passes (%)": reducao_entre_pct,
-        "Redução acumulada (%)": reducao_acum_pct,
-        "Fator restante": fator_acum,
-        valor_col: valor_atual
-    }
-    linhas.append(linha)
-
-# DataFrame principal
-df = pd.DataFrame(linhas)
-
-# Exibir tabela principal
-st.markdown("### Evolução por passe (inclui redução entre passes e acumulada)")
-st.dataframe(df, use_container_width=True)
-
-# Gráfico da grandeza principal (se houver valor inicial)
-if valor_inicial and valor_inicial > 0:
-    st.line_chart(df.set_index("Passe")[valor_col], height=300)
-    st.markdown("---")
-    st.success(f"Valor final ({valor_col}): {valor_atual:.6f}")
+with cron.etapa("tabela"):
+    st.markdown("### Resultado acumulado")
+    st.metric("Redução total (%)", f"{reducao_total_pct:.3f}%")
+    st.metric("Fator restante", f"{fator_restante_total:.6f}")
+
+    # Tabela por passe
+    valor_col = GRANDEZA_AREA if grandeza == GRANDEZA_AREA else GRANDEZA_DIAMETRO
+    valor_atual = esquema.valor_final
+
+    # Exibir tabela principal
+    st.markdown("### Evolução por passe (inclui redução entre passes e acumulada)")
+    st.dataframe(df, use_container_width=True, column_config=colunas_exibicao(df))
 
-# Gráfico da redução entre passes (%)
-if len(df) > 0:
-    df_plot_red = df.dropna(subset=["Redução entre passes (%)"]).set_index("Passe")["Redução entre passes (%)"]
-    st.markdown("### Gráfico — Redução entre passes (%)")
-    st.bar_chart(df_plot_red, height=260)
+# Análise de tolerância e desgaste (Monte Carlo), na barra lateral
+with cron.etapa("monte_carlo"):
+    monte_carlo = None
+    if valor_inicial and valor_inicial > 0:
+        with st.sidebar:
+            st.markdown("### Tolerância e desgaste (Monte Carlo)")
+            if st.checkbox("Mostrar faixas de variação"):
+                mc_desvio_fio = st.number_input("Desvio-padrão do fio-máquina (mm)", min_value=0.0, value=0.05,
+                                                format="%.4f")
+                mc_desvio_fieira = st.number_input("Desvio-padrão da fieira (mm)", min_value=0.0, value=0.005,
+                                                   format="%.4f")
+                mc_desgaste = st.number_input("Desgaste máximo da fieira (mm)", min_value=0.0, value=0.01,
+                                              format="%.4f")
+                mc_amostras = st.select_slider("Bobinas simuladas", options=[10_000, 100_000, 1_000_000, 5_000_000],
+                                               value=1_000_000)
+                monte_carlo = monte_carlo_cache(*chave, mc_desvio_fio, mc_desvio_fieira, mc_desgaste, mc_amostras)
+                st.caption("Faixa P5–P95 no gráfico de evolução; diâmetros variam pela tolerância e pelo desgaste.")
+
+# Gráfico da grandeza principal (se houver valor inicial), com as faixas P5/P50/P95 se calculadas
+with cron.etapa("graficos"):
+    if valor_inicial and valor_inicial > 0:
+        if monte_carlo is None:
+            st.line_chart(graficos["evolucao"], height=300)
+        else:
+            faixas = pd.DataFrame(
+                {f"P{p:g}": monte_carlo.valores[i] for i, p in enumerate(monte_carlo.percentis)},
+                index=graficos["evolucao"].index,
+            )
+            faixas.insert(0, "Nominal", graficos["evolucao"].to_numpy())
+            st.line_chart(faixas, height=300)
+            st.dataframe(pd.DataFrame(
+                {f"Redução acumulada P{p:g} (%)": monte_carlo.reducao_acum_pct[i]
+                 for i, p in enumerate(monte_carlo.percentis)},
+                index=graficos["evolucao"].index,
+            ), use_container_width=True)
+        st.markdown("---")
+        st.success(f"Valor final ({valor_col}): {valor_atual:.6f}")
+
+    # Gráfico da redução entre passes (%)
+    if len(df) > 0:
+        st.markdown("### Gráfico — Redução entre passes (%)")
+        st.bar_chart(graficos["reducao"], height=260)
 
 # Conversões para fio redondo (se houver valor inicial)
-if valor_inicial and valor_inicial > 0 and eh_redondo:
-    if grandeza == "Área (mm²)":
-        # Converter áreas para diâmetros equivalentes
-        valores_area = [lin[valor_col] for lin in linhas if isinstance(lin[valor_col], (int, float))]
-        diametros = [math.sqrt(4.0 * a / math.pi) for a in valores_area]
-        df_diam = pd.DataFrame({
-            "Passe": [lin["Passe"] for lin in linhas if isinstance(lin[valor_col], (int, float))],
-            "Diâmetro (mm)": diametros
-        })
-        st.markdown("### Conversão para diâmetro (fio redondo)")
-        st.dataframe(df_diam, use_container_width=True)
-        st.line_chart(df_diam.set_index("Passe")["Diâmetro (mm)"], height=300)
+with cron.etapa("conversao"):
+    if valor_inicial and valor_inicial > 0 and eh_redondo:
+        if df_conv.columns[1] == GRANDEZA_DIAMETRO:
+            st.markdown("### Conversão para diâmetro (fio redondo)")
+        else:
+            st.markdown("### Conversão para área (fio redondo)")
+        st.dataframe(df_conv, use_container_width=True, column_config=colunas_exibicao(df_conv))
+        st.line_chart(graficos["conversao"], height=300)
+
+# Consulta de redução entre dois passes quaisquer (árvore de produtos por faixa)
+if len(esquema) > 1:
+    with st.expander("Redução entre dois passes"):
+        passe_de, passe_ate = st.slider("Passes", min_value=1, max_value=len(esquema), value=(1, len(esquema)))
+        st.metric(f"Redução do passe {passe_de} ao {passe_ate} (%)", f"{esquema.reducao_pct(passe_de, passe_ate):.3f}%")
+
+# Ajuste dos passes às fieiras padronizadas (se houver valor inicial)
+if valor_inicial and valor_inicial > 0:
+    with st.expander("Ajuste às fieiras padronizadas (catálogo)"):
+        arquivo_catalogo = st.file_uploader(
+            "Catálogo de fieiras (CSV com colunas `diametro` em mm e, opcionalmente, `classe`)", type="csv",
+        )
+        if arquivo_catalogo is not None:
+            try:
+                catalogo = carregar_catalogo_cache(arquivo_catalogo.getvalue())
+            except ValueError as erro:
+                st.error(str(erro))
+            else:
+                classes = catalogo.classes_disponiveis
+                classe = None
+                if len(classes) > 1:
+                    classe = st.selectbox("Classe de tolerância", ["Todas"] + classes)
+                    classe = None if classe == "Todas" else classe
+                resultado = calcular_cache(*chave)
+                ajustados, reducoes_reais = catalogo.ajustar_resultado(resultado, grandeza, classe)
+                col_teorico = f"{valor_col} teórico"
+                st.caption(f"{len(catalogo)} fieiras no catálogo.")
+                st.dataframe(pd.DataFrame({
+                    "Passe": range(1, resultado.num_passes + 1),
+                    col_teorico: resultado.valores[0],
+                    f"{valor_col} na fieira": ajustados[0],
+                    "Redução informada (%)": resultado.reducoes_pct[0],
+                    "Redução real (%)": reducoes_reais[0],
+                }), use_container_width=True)
+
+# Esforços de trefilação por passe (se houver valor inicial)
+if valor_inicial and valor_inicial > 0 and len(esquema) > 0:
+    with st.expander("Esforços de trefilação (tensão, força e potência)"):
+        col_e1, col_e2 = st.columns(2)
+        with col_e1:
+            nome_material = st.selectbox("Material", list(MATERIAIS))
+            angulo = st.number_input("Semiângulo da fieira (graus)", min_value=1.0, max_value=30.0, value=6.0, step=0.5)
+            atrito = st.number_input("Coeficiente de atrito", min_value=0.005, max_value=0.5, value=0.05, step=0.005,
+                                     format="%.3f")
+        with col_e2:
+            velocidade = st.number_input("Velocidade final (m/s)", min_value=0.1, value=10.0, step=0.5)
+            limite_tracao = st.number_input("Limite da razão de tração (σ_t / σ_e)", min_value=0.1, max_value=1.0,
+                                            value=0.8, step=0.05)
+        try:
+            esforcos = esforcos_cache(*chave, nome_material, angulo, atrito, velocidade)
+        except ValueError as erro:
+            st.error(str(erro))
+        else:
+            st.dataframe(pd.DataFrame({
+                "Passe": range(1, len(esquema) + 1),
+                "Deformação acumulada": esforcos.deformacao[0],
+                "Tensão média de escoamento (MPa)": esforcos.tensao_media[0],
+                "Tensão de trefilação (MPa)": esforcos.tensao_trefilacao[0],
+                "Força (N)": esforcos.forca_N[0],
+                "Potência (kW)": esforcos.potencia_kW[0],
+                "Razão de tração": esforcos.razao_tracao[0],
+            }), use_container_width=True)
+            acima = np.flatnonzero(esforcos.acima_do_limite(limite_tracao)[0]) + 1
+            if acima.size:
+                st.warning(f"Risco de ruptura nos passes: {', '.join(map(str, acima))} "
+                           f"(razão de tração acima de {limite_tracao:g}).")
+            else:
+                st.success(f"Todos os passes abaixo da razão de tração {limite_tracao:g}. "
+                           f"Potência total: {np.nansum(esforcos.potencia_kW[0]):.2f} kW.")
+
+# Simulação da produção (velocidades pelos passes, bobinas, trocas e falhas)
+if valor_inicial and valor_inicial > 0 and len(esquema) > 0:
+    with st.expander("Simulador de produção da linha (kg/h)"):
+        col_s1, col_s2, col_s3 = st.columns(3)
+        with col_s1:
+            sim_vmax = st.number_input("Velocidade máx. dos cabrestantes (m/s)", min_value=0.1, value=20.0, step=1.0)
+            sim_potencia = st.number_input("Potência máx. por cabrestante (kW, 0 = sem limite)", min_value=0.0,
+                                           value=0.0, step=5.0)
+            sim_material = st.selectbox("Material (limite de potência)", list(MATERIAIS), key="sim_material")
+            sim_densidade = st.number_input("Densidade (kg/m³)", min_value=100.0, value=7850.0, step=50.0)
+        with col_s2:
+            sim_bobina = st.number_input("Massa da bobina (kg)", min_value=1.0, value=2000.0, step=100.0)
+            sim_troca_bobina = st.number_input("Troca de bobina (min)", min_value=0.0, value=5.0, step=1.0)
+            sim_vida = st.number_input("Vida da fieira (km de fio)", min_value=1.0, value=500.0, step=50.0)
+            sim_troca_fieira = st.number_input("Troca de fieira (min)", min_value=0.0, value=15.0, step=1.0)
+        with col_s3:
+            sim_mtbf = st.number_input("MTBF (h de produção, 0 = sem falhas)", min_value=0.0, value=0.0, step=10.0)
+            sim_mttr = st.number_input("MTTR (min)", min_value=0.0, value=45.0, step=5.0)
+            sim_linhas = st.number_input("Linhas iguais", min_value=1, max_value=50, value=1, step=1)
+            sim_equipes = st.number_input("Equipes de manutenção (0 = sem limite)", min_value=0, value=0, step=1)
+        sim_dias = st.slider("Horizonte (dias)", min_value=1, max_value=90, value=30)
+        try:
+            regime, resumo_sim = simular_linhas_cache(
+                *chave, int(sim_linhas), sim_dias, int(sim_equipes),
+                sim_material if sim_potencia > 0 else None,
+                velocidade_max=sim_vmax, potencia_max_kW=sim_potencia, densidade=sim_densidade,
+                massa_bobina_kg=sim_bobina, troca_bobina_min=sim_troca_bobina, vida_fieira_km=sim_vida,
+                troca_fieira_min=sim_troca_fieira, mtbf_h=sim_mtbf, mttr_min=sim_mttr,
+            )
+        except ValueError as erro:
+            st.error(str(erro))
+        else:
+            st.markdown(f"Gargalo no **passe {regime.gargalo}**: velocidade final "
+                        f"{regime.velocidade_final:.2f} m/s, produção nominal **{regime.taxa_kg_h:.1f} kg/h**.")
+            st.dataframe(pd.DataFrame({
+                "Passe": range(1, len(regime.velocidades) + 1),
+                "Área (mm²)": regime.areas_mm2,
+                "Velocidade (m/s)": regime.velocidades,
+                "Utilização do cabrestante (%)": regime.utilizacao * 100.0,
+            }), hide_index=True, use_container_width=True)
+            st.dataframe(resumo_sim, hide_index=True, use_container_width=True)
+            st.metric("Produção média total (kg/h)", f"{resumo_sim['Média (kg/h)'].sum():.1f}")
+
+# Download dos dados: o CSV só é montado quando pedido, para as entradas atuais
+with cron.etapa("csv"):
+    if st.button("Preparar tabela em CSV"):
+        st.session_state["csv_pedido"] = chave
+    if st.session_state.get("csv_pedido") == chave:
+        st.download_button(
+            label="Baixar tabela em CSV",
+            data=derivado_sessao("csv", lambda: df.to_csv(index=False).encode("utf-8")),
+            file_name="evolucao_reducao_bitola.csv",
+            mime="text/csv",
+        )
+
+# Comparação de vários esquemas em um único gráfico
+with st.expander("Comparar esquemas (vários de uma vez)"):
+    arquivo_esquemas = st.file_uploader(
+        "Esquemas em CSV (uma linha por esquema: colunas `passe_1`, `passe_2`, … em %, "
+        "opcionalmente `valor_inicial` e `esquema`)", type="csv", key="arquivo_esquemas",
+    )
+    if arquivo_esquemas is not None:
+        serie = st.selectbox("Série do gráfico", SERIES, index=1)
+        try:
+            resumo_comparacao, spec = comparacao_cache(arquivo_esquemas.getvalue(), grandeza, serie)
+        except (ValueError, pd.errors.ParserError) as erro:
+            st.error(str(erro))
+        else:
+            st.vega_lite_chart(spec, use_container_width=True)
+            st.dataframe(resumo_comparacao, hide_index=True, use_container_width=True)
+
+# Relatórios formatados (Excel/PDF), gerados em segundo plano
+with st.expander("Relatórios (Excel / PDF)"):
+    formato_relatorio = st.radio("Formato", list(FORMATOS), format_func=FORMATOS.get, horizontal=True)
+    origens = ["Esquema atual"] + (["Esquemas do arquivo de comparação"] if arquivo_esquemas is not None else [])
+    origem_relatorio = st.radio("Conteúdo", origens, horizontal=True)
+    if st.button("Gerar relatório"):
+        try:
+            if origem_relatorio == "Esquema atual":
+                esquemas_relatorio = [("Esquema", chave[2], chave[1])]
+            else:
+                esquemas_relatorio = listar_esquemas(pd.read_csv(io.BytesIO(arquivo_esquemas.getvalue())))
+        except (ValueError, pd.errors.ParserError) as erro:
+            st.error(str(erro))
+        else:
+            st.session_state["relatorio"] = (
+                gerador_relatorios().solicitar(formato_relatorio, esquemas_relatorio, grandeza), formato_relatorio,
+            )
+
+    pedido_relatorio = st.session_state.get("relatorio")
+    if pedido_relatorio is not None:
+        chave_relatorio, formato_pedido = pedido_relatorio
+        andamento = gerador_relatorios().estado(chave_relatorio)
+        if andamento.estado == GERANDO:
+            acompanhar_relatorio(chave_relatorio)
+        elif andamento.estado == PRONTO:
+            st.download_button(
+                label=f"Baixar relatório ({FORMATOS[formato_pedido]})",
+                data=gerador_relatorios().resultado(chave_relatorio),
+                file_name=f"relatorio_reducao_bitola.{formato_pedido}",
+                mime=TIPOS_MIME[formato_pedido],
+            )
+        elif andamento.estado == DESCONHECIDO:
+            st.warning("O relatório pedido não está mais disponível (expirou do cache ou o servidor foi "
+                       "reiniciado). Clique em **Gerar relatório** para gerá-lo de novo.")
+        elif andamento.erro:
+            st.error(f"Falha ao gerar o relatório: {andamento.erro}")
+
+# Otimizador de esquema (busca de reduções a partir do valor alvo)
+with st.expander("Otimizador de esquema — encontrar reduções para um valor alvo"):
+    unidade = "mm" if grandeza == GRANDEZA_DIAMETRO else "mm²"
+    col_o1, col_o2 = st.columns(2)
+    with col_o1:
+        opt_inicial = st.number_input(f"Valor inicial ({unidade})", min_value=0.0,
+                                      value=float(valor_inicial) if valor_inicial else 5.5, format="%.4f")
+        opt_passes = st.slider("Faixa de passes", min_value=1, max_value=40, value=(3, 13))
+        opt_red_max = st.number_input("Redução máxima por passe (%)", min_value=0.1, max_value=99.0, value=30.0,
+                                      step=0.5)
+    with col_o2:
+        opt_alvo = st.number_input(f"Valor alvo ({unidade})", min_value=0.0, value=1.6, format="%.4f")
+        opt_passo = st.select_slider("Discretização das reduções (%)", options=[0.05, 0.1, 0.25, 0.5, 1.0], value=0.5)
+        opt_tol = st.number_input("Tolerância no valor final (%)", min_value=0.001, max_value=10.0, value=0.5, step=0.1)
+    opt_objetivo = st.selectbox("Objetivo", list(OBJETIVOS), format_func=OBJETIVOS.get)
+
+    if st.button("Buscar esquemas"):
+        try:
+            solucoes = otimizar_cache(
+                opt_inicial, opt_alvo, passes_min=opt_passes[0], passes_max=opt_passes[1],
+                reducao_max_pct=opt_red_max, passo_pct=opt_passo, tolerancia_pct=opt_tol,
+                objetivo=opt_objetivo,
+            )
+        except ValueError as erro:
+            st.error(str(erro))
+        else:
+            if not solucoes:
+                st.warning("Nenhum esquema viável com essas restrições.")
+            else:
+                st.dataframe(pd.DataFrame([{
+                    "Passes": sol.num_passes,
+                    "Reduções (%)": " / ".join(f"{r:g}" for r in sol.reducoes_pct),
+                    "Amplitude (p.p.)": sol.amplitude_pct,
+                    f"Valor final ({unidade})": sol.valor_final,
+                    "Erro (%)": sol.erro_pct,
+                } for sol in solucoes]), use_container_width=True)
+
+# Projeto inverso: reduções iguais ou afuniladas que levam ao alvo em N passes
+with st.expander("Projeto inverso — reduções iguais ou afuniladas em N passes"):
+    col_p1, col_p2 = st.columns(2)
+    with col_p1:
+        pi_inicial = st.number_input(f"Valor inicial ({unidade})", min_value=0.0, key="pi_inicial",
+                                     value=float(valor_inicial) if valor_inicial else 5.5, format="%.4f")
+        pi_passes = st.slider("Número de passes", min_value=1, max_value=40, value=8, key="pi_passes")
+    with col_p2:
+        pi_alvo = st.number_input(f"Valor alvo ({unidade})", min_value=0.0, value=1.6, format="%.4f", key="pi_alvo")
+        pi_afunilamento = st.select_slider(
+            "Afunilamento q (rₖ = r₁·q^(k-1); 1 = reduções iguais)", options=AFUNILAMENTOS_PADRAO, value=1.0,
+        )
+    try:
+        pi_reducoes, da_grade = projetar_cache(pi_inicial, pi_alvo, pi_passes, pi_afunilamento)
+    except ValueError as erro:
+        st.error(str(erro))
     else:
-        # Converter diâmetros para áreas equivalentes
-        valores_diam = [lin[valor_col] for lin in linhas if isinstance(lin[valor_col], (int, float))]
-        areas = [math.pi * (d ** 2) / 4.0 for d in valores_diam]
-        df_area = pd.DataFrame({
-            "Passe": [lin["Passe"] for lin in linhas if isinstance(lin[valor_col], (int, float))],
-            "Área (mm²)": areas
-        })
-        st.markdown("### Conversão para área (fio redondo)")
-        st.dataframe(df_area, use_container_width=True)
-        st.line_chart(df_area.set_index("Passe")["Área (mm²)"], height=300)
-
-# Download dos dados
-csv = df.to_csv(index=False).encode("utf-8")
-st.download_button(
-    label="Baixar tabela em CSV",
-    data=csv,
-    file_name="evolucao_reducao_bitola.csv",
-    mime="text/csv",
-)
+        pi_resultado = calcular_esquema(pi_reducoes, pi_inicial)
+        st.dataframe(pd.DataFrame({
+            "Passe": range(1, pi_passes + 1),
+            "Redução (%)": pi_reducoes,
+            f"Valor ({unidade})": pi_resultado.valores[0],
+        }), use_container_width=True)
+        st.caption("Consulta à grade pré-calculada." if da_grade
+                   else "Calculado na hora (combinação fora da grade pré-calculada).")
+        _, csv_projeto = tabela_projeto_cache(pi_inicial, pi_alvo)
+        st.download_button(
+            label="Baixar tabela de projeto (todos os passes e afunilamentos)",
+            data=csv_projeto,
+            file_name="projeto_inverso.csv",
+            mime="text/csv",
+        )
 
 # Notas finais
 st.caption(
@@ -171,3 +682,14 @@ st.caption(
     • Para fio redondo, área = π·d²/4 e d = √(4·área/π).
     """
 )
+
+# Painel de tempos por etapa (percentis móveis da sessão) e exportação
+cron.finalizar()
+if cron.ativo:
+    with st.sidebar.expander("Tempos por etapa (ms)", expanded=True):
+        resumo = cron.resumo()
+        st.dataframe(pd.DataFrame(resumo).set_index("etapa").round(3), use_container_width=True)
+        col_t1, col_t2 = st.columns(2)
+        col_t1.download_button("CSV", cron.exportar_csv(), file_name="tempos_etapas.csv", mime="text/csv")
+        col_t2.download_button("JSON", cron.exportar_json(), file_name="tempos_etapas.json",
+                               mime="application/json")
@@ -0,0 +1,238 @@
+"""
+Benchmarks da página Streamlit, executada sem navegador (streamlit.testing).
+
+    python benchmark_app.py micro                  # tempo por rerun, por cenário
+    python benchmark_app.py carga --sessoes 16     # N sessões simultâneas
+    python benchmark_app.py comparar               # últimas execuções de cada suíte
+
+Os cenários cobrem 1, 13 e muitos passes, com e sem valor inicial, nas duas
+grandezas. Cada rerun altera uma redução (como um usuário editando a tabela),
+de modo que os caches de resultado não mascaram o cálculo. A carga simula
+sessões concorrentes no mesmo processo, como no servidor, e informa P50/P95/P99
+da latência por rerun e o pico de memória residente (RSS).
+
+Os resultados são acrescentados a benchmarks/resultados.jsonl com o commit
+corrente, para comparação entre versões. Não são testes: nada falha por tempo.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from calculo_bitola import GRANDEZA_AREA, GRANDEZA_DIAMETRO
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+ARQUIVO_APP = os.path.join(DIRETORIO, "app_reducao_bitola.py")
+ARQUIVO_RESULTADOS = os.path.join(DIRETORIO, "benchmarks", "resultados.jsonl")
+PASSES_CENARIOS = (1, 13, 200)
+VALORES_INICIAIS = {GRANDEZA_DIAMETRO: 5.5, GRANDEZA_AREA: 23.76}
+PERCENTIS = (50, 95, 99)
+TEMPO_LIMITE_S = 120
+
+# Editor de reduções da página: coluna, chave e número de linhas iniciais
+COL_ENTRADA = "Redução (%)"
+CHAVE_EDITOR = "editor_reducoes"
+PASSES_PADRAO = 5
+BOTAO_CALCULAR = "Calcular"
+
+
+def _estado_editor(reducoes):
+    """Estado do `st.data_editor` de reduções: a tabela padrão editada para `reducoes`."""
+    return {
+        "edited_rows": {i: {COL_ENTRADA: r} for i, r in enumerate(reducoes[:PASSES_PADRAO])},
+        "added_rows": [{COL_ENTRADA: r} for r in reducoes[PASSES_PADRAO:]],
+        "deleted_rows": list(range(len(reducoes), PASSES_PADRAO)),
+    }
+
+
+def _reducoes_aleatorias(rng, num_passes):
+    return [round(rng.uniform(2.0, 8.0), 3) for _ in range(num_passes)]
+
+
+class SessaoSimulada:
+    """Uma sessão da página: aplica entradas e mede cada rerun (ms)."""
+
+    def __init__(self, grandeza, valor_inicial, num_passes, semente=0):
+        from streamlit.testing.v1 import AppTest
+
+        self.rng = random.Random(semente)
+        self.reducoes = _reducoes_aleatorias(self.rng, num_passes)
+        self.app = AppTest.from_file(ARQUIVO_APP, default_timeout=TEMPO_LIMITE_S)
+        self.app.session_state[CHAVE_EDITOR] = _estado_editor(self.reducoes)
+        self.tempo_inicial_ms = self._rodar()
+        if grandeza != self.app.selectbox[0].value or valor_inicial:
+            self.app.selectbox[0].set_value(grandeza)
+            self.app.number_input[0].set_value(valor_inicial)
+            self._confirmar()
+            self._rodar()
+
+    def _confirmar(self):
+        """Envia o formulário de entradas, quando a página está em modo formulário."""
+        for botao in self.app.button:
+            if botao.label == BOTAO_CALCULAR:
+                botao.click()
+
+    def _rodar(self):
+        inicio = time.perf_counter()
+        self.app.run()
+        ms = (time.perf_counter() - inicio) * 1000.0
+        if self.app.exception:
+            raise RuntimeError(f"Exceção na página: {self.app.exception[0].value}")
+        return ms
+
+    def editar(self):
+        """Altera a redução de um passe sorteado e reexecuta a página."""
+        passe = self.rng.randrange(len(self.reducoes))
+        self.reducoes[passe] = round(self.rng.uniform(2.0, 8.0), 3)
+        self.app.session_state[CHAVE_EDITOR] = _estado_editor(self.reducoes)
+        return self._rodar()
+
+
+def _estatisticas(tempos_ms):
+    tempos = np.asarray(tempos_ms, dtype=np.float64)
+    registro = {"n": int(tempos.size), "media_ms": float(tempos.mean())}
+    for p, v in zip(PERCENTIS, np.percentile(tempos, PERCENTIS)):
+        registro[f"p{p}_ms"] = float(v)
+    return registro
+
+
+def rss_pico_mb():
+    """Pico de memória residente do processo (MB)."""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024.0 * 1024.0) if sys.platform == "darwin" else pico / 1024.0
+
+
+def micro(reruns=20):
+    """Tempo por rerun de cada cenário (passes × valor inicial × grandeza)."""
+    cenarios = []
+    for grandeza in (GRANDEZA_DIAMETRO, GRANDEZA_AREA):
+        for num_passes in PASSES_CENARIOS:
+            for com_valor in (False, True):
+                valor = VALORES_INICIAIS[grandeza] if com_valor else 0.0
+                sessao = SessaoSimulada(grandeza, valor, num_passes)
+                tempos = [sessao.editar() for _ in range(reruns)]
+                registro = {"grandeza": grandeza, "passes": num_passes, "valor_inicial": valor,
+                            "primeiro_ms": sessao.tempo_inicial_ms}
+                registro.update(_estatisticas(tempos))
+                cenarios.append(registro)
+                print(f"{grandeza:<14} {num_passes:>4} passes  valor={valor:<6g} "
+                      f"p50={registro['p50_ms']:8.1f} ms  p95={registro['p95_ms']:8.1f} ms")
+    return {"reruns": reruns, "cenarios": cenarios, "rss_pico_mb": rss_pico_mb()}
+
+
+def carga(sessoes=8, reruns=20, num_passes=13):
+    """N sessões simultâneas editando entradas; latência por rerun e pico de RSS."""
+    def executar(i):
+        grandeza = (GRANDEZA_DIAMETRO, GRANDEZA_AREA)[i % 2]
+        sessao = SessaoSimulada(grandeza, VALORES_INICIAIS[grandeza], num_passes, semente=i)
+        return [sessao.editar() for _ in range(reruns)]
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessoes) as executor:
+        tempos = [ms for lista in executor.map(executar, range(sessoes)) for ms in lista]
+    duracao = time.perf_counter() - inicio
+    registro = {"sessoes": sessoes, "reruns": reruns, "passes": num_passes, "duracao_s": duracao,
+                "reruns_por_s": len(tempos) / duracao, "rss_pico_mb": rss_pico_mb()}
+    registro.update(_estatisticas(tempos))
+    print(f"{sessoes} sessões × {reruns} reruns: p50={registro['p50_ms']:.1f} ms  p95={registro['p95_ms']:.1f} ms  "
+          f"p99={registro['p99_ms']:.1f} ms  {registro['reruns_por_s']:.1f} reruns/s  "
+          f"RSS pico={registro['rss_pico_mb']:.0f} MB")
+    return registro
+
+
+def _commit():
+    try:
+        saida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=DIRETORIO,
+                               capture_output=True, text=True, check=True)
+        sujo = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=DIRETORIO,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return saida.stdout.strip() + ("-modificado" if sujo else "")
+
+
+def registrar(suite, resultados, arquivo=ARQUIVO_RESULTADOS):
+    """Acrescenta uma execução ao arquivo de resultados (uma linha JSON por execução)."""
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+    linha = {
+        "suite": suite,
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "maquina": platform.platform(),
+        "processadores": os.cpu_count(),
+        "resultados": resultados,
+    }
+    with open(arquivo, "a", encoding="utf-8") as f:
+        f.write(json.dumps(linha, ensure_ascii=False) + "\n")
+
+
+def comparar(arquivo=ARQUIVO_RESULTADOS, ultimas=2):
+    """Mostra as últimas execuções de cada suíte lado a lado."""
+    if not os.path.exists(arquivo):
+        print("Nenhum resultado registrado.")
+        return
+    with open(arquivo, encoding="utf-8") as f:
+        execucoes = [json.loads(linha) for linha in f if linha.strip()]
+    for suite in ("micro", "carga"):
+        recentes = [e for e in execucoes if e["suite"] == suite][-ultimas:]
+        if not recentes:
+            continue
+        print(f"\n== {suite} ==")
+        print("commit".ljust(24) + "".join(f"{e['commit'] or '?':>20}" for e in recentes))
+        if suite == "carga":
+            for campo in ("p50_ms", "p95_ms", "p99_ms", "reruns_por_s", "rss_pico_mb"):
+                print(campo.ljust(24) + "".join(f"{e['resultados'][campo]:>20.1f}" for e in recentes))
+        else:
+            for i, cenario in enumerate(recentes[-1]["resultados"]["cenarios"]):
+                rotulo = f"{cenario['grandeza'][:4]} {cenario['passes']}p v={cenario['valor_inicial']:g}"
+                valores = []
+                for e in recentes:
+                    outros = e["resultados"]["cenarios"]
+                    valores.append(f"{outros[i]['p50_ms']:>20.1f}" if i < len(outros) else f"{'-':>20}")
+                print(f"{rotulo:<24}" + "".join(valores) + "   (p50 ms)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="suite", required=True)
+    p_micro = sub.add_parser("micro", help="Tempo por rerun de cada cenário")
+    p_micro.add_argument("--reruns", type=int, default=20)
+    p_carga = sub.add_parser("carga", help="Sessões simultâneas")
+    p_carga.add_argument("--sessoes", type=int, default=8)
+    p_carga.add_argument("--reruns", type=int, default=20)
+    p_carga.add_argument("--passes", type=int, default=13)
+    p_comparar = sub.add_parser("comparar", help="Compara as últimas execuções registradas")
+    p_comparar.add_argument("--ultimas", type=int, default=2)
+    for p in (p_micro, p_carga):
+        p.add_argument("--nao-registrar", action="store_true", help="Não grava em benchmarks/resultados.jsonl")
+    args = parser.parse_args(argv)
+
+    if args.suite == "comparar":
+        comparar(ultimas=args.ultimas)
+        return 0
+
+    # Cache persistente isolado: execuções anteriores não devem acelerar as medições
+    with tempfile.TemporaryDirectory() as temporario:
+        os.environ["REDUCAO_BITOLA_CACHE"] = os.path.join(temporario, "resultados.sqlite")
+        if args.suite == "micro":
+            resultados = micro(args.reruns)
+        else:
+            resultados = carga(args.sessoes, args.reruns, args.passes)
+    if not args.nao_registrar:
+        registrar(args.suite, resultados)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""
+Cache de resultados compartilhado entre sessões, usuários e reinícios do servidor.
+
+Duas camadas: um LRU em memória no processo e um arquivo SQLite local (modo
+WAL, seguro para vários processos e threads). As entradas são identificadas
+por uma chave canônica (hash SHA-256) das entradas normalizadas e o arquivo é
+mantido abaixo de um tamanho máximo, descartando as entradas usadas há mais
+tempo. O tamanho total fica em uma tabela auxiliar, mantida por gatilhos, e os
+acessos servidos pela memória são gravados no arquivo em lotes.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+CAMINHO_PADRAO = os.environ.get(
+    "REDUCAO_BITOLA_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "reducao_bitola", "resultados.sqlite"),
+)
+TAMANHO_MAXIMO_PADRAO = 256 * 1024 * 1024  # bytes no arquivo SQLite
+ENTRADAS_MEMORIA_PADRAO = 256
+# Acessos servidos pela memória são gravados no disco a cada intervalo (s) ou lote
+INTERVALO_ACESSOS = 10.0
+LOTE_ACESSOS = 256
+# Entra na chave: mude ao alterar o conteúdo ou o formato dos valores guardados
+VERSAO_CACHE = 2
+
+
+def chave_canonica(grandeza, valor_inicial, reducoes_pct):
+    """
+    Hash estável das entradas e de `VERSAO_CACHE`: valor ausente/não positivo
+    vira 0 e floats são serializados por repr.
+    """
+    valor = float(valor_inicial) if valor_inicial and valor_inicial > 0 else 0.0
+    dados = [VERSAO_CACHE, str(grandeza), repr(valor), [repr(float(r)) for r in reducoes_pct]]
+    return hashlib.sha256(json.dumps(dados, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+class CachePersistente:
+    """Cache LRU em memória + SQLite, com limite de tamanho em disco."""
+
+    def __init__(self, caminho=CAMINHO_PADRAO, tamanho_maximo=TAMANHO_MAXIMO_PADRAO,
+                 entradas_memoria=ENTRADAS_MEMORIA_PADRAO):
+        self.caminho = caminho
+        self.tamanho_maximo = tamanho_maximo
+        self.entradas_memoria = entradas_memoria
+        self._memoria = OrderedDict()
+        self._acessos = {}  # chave -> último acesso pela memória, ainda não gravado
+        self._acessos_gravados_em = time.monotonic()
+        self._trava = threading.Lock()
+
+        if caminho != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        # Uma conexão por instância, protegida pela trava; entre processos, o SQLite coordena
+        self._conexao = sqlite3.connect(caminho, timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS resultados ("
+            " chave TEXT PRIMARY KEY, dados BLOB NOT NULL,"
+            " tamanho INTEGER NOT NULL, ultimo_acesso REAL NOT NULL)"
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_ultimo_acesso ON resultados (ultimo_acesso)")
+        # Tamanho total mantido pelos gatilhos (somado uma única vez em arquivos anteriores à tabela)
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS uso (id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER NOT NULL)"
+        )
+        self._conexao.execute(
+            "INSERT OR IGNORE INTO uso VALUES (0, (SELECT COALESCE(SUM(tamanho), 0) FROM resultados))"
+        )
+        self._conexao.execute(
+            "CREATE TRIGGER IF NOT EXISTS uso_inserir AFTER INSERT ON resultados"
+            " BEGIN UPDATE uso SET total = total + NEW.tamanho; END"
+        )
+        self._conexao.execute(
+            "CREATE TRIGGER IF NOT EXISTS uso_atualizar AFTER UPDATE OF tamanho ON resultados"
+            " BEGIN UPDATE uso SET total = total + NEW.tamanho - OLD.tamanho; END"
+        )
+        self._conexao.execute(
+            "CREATE TRIGGER IF NOT EXISTS uso_remover AFTER DELETE ON resultados"
+            " BEGIN UPDATE uso SET total = total - OLD.tamanho; END"
+        )
+
+    def _lembrar(self, chave, valor):
+        self._memoria[chave] = valor
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.entradas_memoria:
+            self._memoria.popitem(last=False)
+
+    def obter(self, chave, padrao=None):
+        """Valor da chave (memória, depois disco) ou `padrao`."""
+        with self._trava:
+            if chave in self._memoria:
+                self._memoria.move_to_end(chave)
+                self._acessos[chave] = time.time()
+                if (len(self._acessos) >= LOTE_ACESSOS
+                        or time.monotonic() - self._acessos_gravados_em >= INTERVALO_ACESSOS):
+                    with self._transacao():
+                        self._gravar_acessos()
+                return self._memoria[chave]
+            linha = self._conexao.execute("SELECT dados FROM resultados WHERE chave = ?", (chave,)).fetchone()
+            if linha is None:
+                return padrao
+            try:
+                valor = pickle.loads(linha[0])
+            except Exception:
+                # entrada corrompida ou de outra versão das bibliotecas: descarta e recalcula
+                self._conexao.execute("DELETE FROM resultados WHERE chave = ?", (chave,))
+                return padrao
+            self._conexao.execute("UPDATE resultados SET ultimo_acesso = ? WHERE chave = ?", (time.time(), chave))
+            self._lembrar(chave, valor)
+            return valor
+
+    @contextmanager
+    def _transacao(self):
+        self._conexao.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            self._conexao.execute("COMMIT")
+        except BaseException:
+            self._conexao.execute("ROLLBACK")
+            raise
+
+    def _gravar_acessos(self):
+        """Grava os acessos pendentes servidos pela memória (dentro de uma transação)."""
+        if self._acessos:
+            self._conexao.executemany(
+                "UPDATE resultados SET ultimo_acesso = MAX(ultimo_acesso, ?) WHERE chave = ?",
+                [(instante, chave) for chave, instante in self._acessos.items()],
+            )
+            self._acessos.clear()
+        self._acessos_gravados_em = time.monotonic()
+
+    def contem(self, chave):
+        """True se a chave está em cache (sem carregar o valor)."""
+        with self._trava:
+            if chave in self._memoria:
+                return True
+            return self._conexao.execute("SELECT 1 FROM resultados WHERE chave = ?", (chave,)).fetchone() is not None
+
+    def gravar(self, chave, valor):
+        dados = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._trava:
+            self._lembrar(chave, valor)
+            if len(dados) > self.tamanho_maximo:
+                return  # maior que o cache inteiro: fica só na memória
+            with self._transacao():
+                self._conexao.execute(
+                    "INSERT INTO resultados (chave, dados, tamanho, ultimo_acesso) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (chave) DO UPDATE SET dados = excluded.dados, tamanho = excluded.tamanho,"
+                    " ultimo_acesso = excluded.ultimo_acesso",
+                    (chave, sqlite3.Binary(dados), len(dados), time.time()),
+                )
+                self._gravar_acessos()  # o despejo considera os acessos recentes
+                self._despejar()
+
+    def _despejar(self):
+        """Remove as entradas menos recentes até o total caber no limite (dentro da transação)."""
+        total = self._conexao.execute("SELECT total FROM uso").fetchone()[0]
+        if total <= self.tamanho_maximo:
+            return
+        excesso = total - self.tamanho_maximo
+        remover = []
+        for chave, tamanho in self._conexao.execute(
+                "SELECT chave, tamanho FROM resultados ORDER BY ultimo_acesso"):
+            remover.append((chave,))
+            excesso -= tamanho
+            if excesso <= 0:
+                break
+        self._conexao.executemany("DELETE FROM resultados WHERE chave = ?", remover)
+        for (chave,) in remover:
+            self._memoria.pop(chave, None)
+            self._acessos.pop(chave, None)
+
+    def obter_ou_calcular(self, chave, calcular):
+        """Devolve o valor em cache ou chama `calcular()`, grava e devolve o resultado."""
+        valor = self.obter(chave)
+        if valor is None:
+            valor = calcular()
+            self.gravar(chave, valor)
+        return valor
+
+    def limpar(self):
+        with self._trava:
+            self._memoria.clear()
+            self._acessos.clear()
+            self._conexao.execute("DELETE FROM resultados")
+
+    def fechar(self):
+        with self._trava:
+            if self._acessos:
+                with self._transacao():
+                    self._gravar_acessos()
+            self._conexao.close()
+
+
+_global = None
+_trava_global = threading.Lock()
+
+
+def cache_global():
+    """Instância única por processo, no caminho padrão (só em memória se o arquivo não puder ser aberto)."""
+    global _global
+    with _trava_global:
+        if _global is None:
+            try:
+                _global = CachePersistente()
+            except (OSError, sqlite3.Error):
+                _global = CachePersistente(":memory:")
+        return _global
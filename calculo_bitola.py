@@ -0,0 +1,228 @@
+"""
+Núcleo de cálculo da redução de bitola, independente do Streamlit.
+
+Trabalha com uma matriz de esquemas (esquemas × passes) de reduções em %,
+usando somas acumuladas e broadcasting do NumPy em vez de laços por passe.
+Os produtos ∏(1 - rᵢ) são acumulados em espaço logarítmico, o que evita
+underflow e perda de precisão em esquemas com centenas de passes.
+
+O módulo importa apenas a biblioteca padrão e o NumPy; o pandas só é
+carregado quando uma tabela (DataFrame/CSV) é de fato pedida.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+GRANDEZA_DIAMETRO = "Diâmetro (mm)"
+GRANDEZA_AREA = "Área (mm²)"
+GRANDEZAS = [GRANDEZA_DIAMETRO, GRANDEZA_AREA]
+
+COL_PASSE = "Passe"
+COL_RED_ENTRE = "Redução entre passes (%)"
+COL_RED_ACUM = "Redução acumulada (%)"
+COL_FATOR = "Fator restante"
+
+# Colunas de reduções no formato de lote: passe_1, passe_2, …
+PADRAO_PASSE = re.compile(r"^passe_(\d+)$", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class ResultadoLote:
+    """Resultado por passe de um lote de esquemas (arrays de forma (m, n))."""
+
+    reducoes_pct: np.ndarray      # reduções informadas por passe (%)
+    fator_restante: np.ndarray    # fator restante após cada passe
+    reducao_acum_pct: np.ndarray  # redução acumulada até cada passe (%)
+    valores_iniciais: np.ndarray  # (m,) — NaN quando não informado
+    valores: np.ndarray           # grandeza após cada passe — NaN sem valor inicial
+
+    @property
+    def num_esquemas(self):
+        return self.reducoes_pct.shape[0]
+
+    @property
+    def num_passes(self):
+        return self.reducoes_pct.shape[1]
+
+    @property
+    def fator_total(self):
+        """Fator restante ao final de cada esquema, forma (m,)."""
+        if self.num_passes == 0:
+            return np.ones(self.num_esquemas)
+        return self.fator_restante[:, -1]
+
+    @property
+    def reducao_total_pct(self):
+        return (1.0 - self.fator_total) * 100.0
+
+    @property
+    def valores_finais(self):
+        if self.num_passes == 0:
+            return self.valores_iniciais.copy()
+        return self.valores[:, -1]
+
+
+def _como_matriz_reducoes(reducoes_pct):
+    red = np.asarray(reducoes_pct, dtype=np.float64)
+    if red.ndim == 1:
+        red = red[np.newaxis, :]
+    if red.ndim != 2:
+        raise ValueError("As reduções devem formar uma matriz (esquemas × passes).")
+    if np.isnan(red).any() or (red < 0.0).any() or (red > 100.0).any():
+        raise ValueError("As reduções por passe devem estar entre 0 e 100%.")
+    return red
+
+
+def _como_valores_iniciais(valores_iniciais, num_esquemas):
+    if valores_iniciais is None:
+        return np.full(num_esquemas, np.nan)
+    v0 = np.array(valores_iniciais, dtype=np.float64, ndmin=1)
+    v0 = np.broadcast_to(v0, (num_esquemas,)).copy()
+    # Valor inicial ausente ou não positivo equivale a "não informado"
+    v0[~(v0 > 0.0)] = np.nan
+    return v0
+
+
+def colunas_de_passe(colunas):
+    """
+    Colunas `passe_<k>` ordenadas pelo número do passe; ValueError se os
+    números não forem exatamente 1..n (lacunas ou repetições).
+    """
+    encontradas = sorted((int(m.group(1)), c) for c in colunas if (m := PADRAO_PASSE.match(str(c))))
+    numeros = [k for k, _ in encontradas]
+    if numeros != list(range(1, len(numeros) + 1)):
+        raise ValueError(f"As colunas de passe devem ser passe_1 a passe_{len(numeros)}, sem lacunas nem "
+                         f"repetições (encontradas: {', '.join(str(c) for _, c in encontradas)}).")
+    return [c for _, c in encontradas]
+
+
+def matriz_de_passes(tabela, ids=None):
+    """
+    Reduções (%) das colunas `passe_<k>` de uma tabela (pandas), com zeros após
+    o último passe de cada esquema, e o número de passes de cada um (índice do
+    último passe preenchido). Passes vazios no fim do esquema são ignorados; um
+    passe vazio entre passes preenchidos é erro (ValueError com os esquemas
+    afetados, identificados por `ids` ou pelo número da linha).
+    """
+    cols = colunas_de_passe(tabela.columns)
+    if not cols:
+        raise ValueError("Nenhuma coluna 'passe_<k>' encontrada.")
+    red = tabela[cols].to_numpy(dtype=np.float64)
+    preenchido = ~np.isnan(red)
+    n = red.shape[1]
+    num_passes = np.where(preenchido.any(axis=1), n - np.argmax(preenchido[:, ::-1], axis=1), 0)
+    com_lacuna = np.flatnonzero((~preenchido & (np.arange(n) < num_passes[:, np.newaxis])).any(axis=1))
+    if com_lacuna.size:
+        nomes = np.arange(1, red.shape[0] + 1) if ids is None else np.asarray(ids)
+        lista = ", ".join(str(i) for i in nomes[com_lacuna[:10]]) + (", …" if com_lacuna.size > 10 else "")
+        raise ValueError(f"Passe vazio entre passes preenchidos nos esquemas: {lista}.")
+    return np.where(preenchido, red, 0.0), num_passes
+
+
+def calcular_lote(reducoes_pct, valores_iniciais=None):
+    """
+    Calcula a evolução de vários esquemas de uma só vez.
+
+    `reducoes_pct` tem forma (m, n) ou (n,) com reduções em %; `valores_iniciais`
+    é um escalar ou um array (m,) com o diâmetro/área inicial de cada esquema
+    (valores ausentes, nulos ou não positivos resultam em NaN nos valores).
+    """
+    red = _como_matriz_reducoes(reducoes_pct)
+    v0 = _como_valores_iniciais(valores_iniciais, red.shape[0])
+
+    # ln F_k = Σ_{i=1..k} ln(1 - r_i); redução 100% leva a ln 0 = -inf (F = 0)
+    with np.errstate(divide="ignore"):
+        log_fator = np.cumsum(np.log1p(-red / 100.0), axis=1)
+    fator = np.exp(log_fator)
+    # 1 - F_k via expm1 mantém a precisão quando F_k ≈ 1
+    reducao_acum = 0.0 - np.expm1(log_fator) * 100.0
+    valores = v0[:, np.newaxis] * fator
+
+    return ResultadoLote(
+        reducoes_pct=red,
+        fator_restante=fator,
+        reducao_acum_pct=reducao_acum,
+        valores_iniciais=v0,
+        valores=valores,
+    )
+
+
+def calcular_esquema(reducoes_pct, valor_inicial=None):
+    """Atalho para um único esquema (lote com uma linha)."""
+    return calcular_lote(np.asarray(reducoes_pct, dtype=np.float64).reshape(1, -1), valor_inicial)
+
+
+def eh_decrescente(reducoes_pct):
+    """Verifica r₁ ≥ r₂ ≥ r₃ … para cada esquema; retorna array booleano (m,)."""
+    red = _como_matriz_reducoes(reducoes_pct)
+    return np.all(red[:, :-1] >= red[:, 1:], axis=1)
+
+
+def area_para_diametro(area):
+    """Diâmetro equivalente de fio redondo: d = √(4·área/π)."""
+    return np.sqrt(4.0 * np.asarray(area, dtype=np.float64) / math.pi)
+
+
+def diametro_para_area(diametro):
+    """Área de fio redondo: área = π·d²/4."""
+    return math.pi * np.asarray(diametro, dtype=np.float64) ** 2 / 4.0
+
+
+def converter_fio_redondo(valores, grandeza):
+    """Converte a grandeza principal para a outra (área ↔ diâmetro)."""
+    if grandeza == GRANDEZA_AREA:
+        return GRANDEZA_DIAMETRO, area_para_diametro(valores)
+    return GRANDEZA_AREA, diametro_para_area(valores)
+
+
+def tabela_evolucao(resultado, grandeza, indice=0):
+    """
+    Monta a tabela por passe de um esquema do lote, nas mesmas colunas do
+    aplicativo (com a linha "Inicial" quando há valor inicial).
+    """
+    valor_col = GRANDEZA_AREA if grandeza == GRANDEZA_AREA else GRANDEZA_DIAMETRO
+    n = resultado.num_passes
+    v0 = resultado.valores_iniciais[indice]
+    tem_valor = not np.isnan(v0)
+
+    passes = list(range(1, n + 1))
+    red_entre = resultado.reducoes_pct[indice]
+    red_acum = resultado.reducao_acum_pct[indice]
+    fator = resultado.fator_restante[indice]
+    valores = resultado.valores[indice] if tem_valor else np.full(n, None, dtype=object)
+
+    if tem_valor:
+        passes = ["Inicial"] + passes
+        red_entre = np.concatenate(([np.nan], red_entre))
+        red_acum = np.concatenate(([0.0], red_acum))
+        fator = np.concatenate(([1.0], fator))
+        valores = np.concatenate(([v0], valores))
+
+    import pandas as pd
+
+    return pd.DataFrame({
+        COL_PASSE: passes,
+        COL_RED_ENTRE: red_entre,
+        COL_RED_ACUM: red_acum,
+        COL_FATOR: fator,
+        valor_col: valores,
+    })
+
+
+def tabela_lote(resultado, grandeza, ids=None, num_passes=None, colunas_extras=None):
+    """
+    Tabela "longa" de um lote inteiro, uma linha por passe de cada esquema,
+    com as colunas do CSV exportado pelo aplicativo precedidas de "Esquema".
+
+    `num_passes` (m,) permite esquemas com menos passes que a largura da matriz:
+    os passes além do comprimento de cada esquema são omitidos.
+    `colunas_extras` acrescenta colunas por passe ({nome: array (m, n)}),
+    vazias na linha "Inicial". Para exportar lotes grandes sem passar pelo
+    pandas, use `resultado_colunar.ResultadoColunar`.
+    """
+    from resultado_colunar import ResultadoColunar
+
+    return ResultadoColunar.de_lote(resultado, grandeza, ids, num_passes, colunas_extras).para_pandas()
@@ -0,0 +1,130 @@
+"""
+Comparação de vários esquemas em um único gráfico.
+
+Os esquemas vêm no formato do processamento em lote (`passe_1`, `passe_2`, …,
+opcionalmente `valor_inicial` e uma coluna de identificação), são calculados
+de uma vez com `calcular_lote` e viram uma única especificação Vega-Lite com
+uma série por esquema. Séries longas são reduzidas no servidor (mínimo e
+máximo por intervalo, preservando picos) para que o gráfico enviado ao
+navegador tenha no máximo `max_pontos` pontos no total.
+"""
+
+import numpy as np
+
+from calculo_bitola import (
+    COL_FATOR,
+    COL_RED_ACUM,
+    COL_RED_ENTRE,
+    calcular_lote,
+    eh_decrescente,
+    matriz_de_passes,
+)
+
+COL_ID_PADRAO = "esquema"
+SERIE_VALOR = "Valor"
+SERIES = (SERIE_VALOR, COL_RED_ACUM, COL_RED_ENTRE, COL_FATOR)
+MAX_PONTOS_GRAFICO = 5000
+
+
+def _ids(tabela, coluna_id):
+    if coluna_id in tabela:
+        return tabela[coluna_id].astype(str).to_numpy()
+    return np.arange(1, len(tabela) + 1).astype(str)
+
+
+def calcular_esquemas(tabela, coluna_id=COL_ID_PADRAO):
+    """
+    Calcula todos os esquemas da tabela (pandas) em um lote.
+    Retorna (ids, resultado, num_passes); passes vazios no fim de cada esquema são
+    ignorados e um passe vazio entre passes preenchidos é erro (ValueError).
+    """
+    ids = _ids(tabela, coluna_id)
+    red, num_passes = matriz_de_passes(tabela, ids)
+    v0 = tabela["valor_inicial"].to_numpy(dtype=np.float64) if "valor_inicial" in tabela else None
+    return ids, calcular_lote(red, v0), num_passes
+
+
+def listar_esquemas(tabela, coluna_id=COL_ID_PADRAO):
+    """Esquemas da tabela como (id, reduções em %, valor inicial), sem os passes vazios do fim."""
+    ids = _ids(tabela, coluna_id)
+    red, num_passes = matriz_de_passes(tabela, ids)
+    v0 = tabela["valor_inicial"].to_numpy(dtype=np.float64) if "valor_inicial" in tabela else np.zeros(len(tabela))
+    return [(str(i), tuple(r[:n]), 0.0 if np.isnan(v) else float(v)) for i, r, n, v in zip(ids, red, num_passes, v0)]
+
+
+def resumo_esquemas(ids, resultado, num_passes):
+    """Tabela (pandas) com uma linha por esquema: passes, redução total, valor final, decrescente."""
+    import pandas as pd
+
+    linhas = np.arange(resultado.num_esquemas)
+    ultimo = np.maximum(num_passes - 1, 0)
+    return pd.DataFrame({
+        "Esquema": ids,
+        "Passes": num_passes,
+        "Redução total (%)": np.where(num_passes > 0, resultado.reducao_acum_pct[linhas, ultimo], 0.0),
+        "Valor final": np.where(num_passes > 0, resultado.valores[linhas, ultimo], resultado.valores_iniciais),
+        "Decrescente": eh_decrescente(resultado.reducoes_pct),
+    })
+
+
+def reduzir_serie(x, y, max_pontos):
+    """
+    Reduz a série a no máximo `max_pontos` pontos: divide em intervalos iguais e
+    mantém, de cada um, os pontos de mínimo e de máximo (na ordem original).
+    """
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    if y.size <= max_pontos:
+        return x, y
+    intervalos = max(max_pontos // 2, 1)
+    tamanho = -(-y.size // intervalos)
+    preenchida = np.full(intervalos * tamanho, np.nan)
+    preenchida[:y.size] = y
+    blocos = preenchida.reshape(intervalos, tamanho)
+    validos = ~np.isnan(blocos).all(axis=1)
+    base = np.arange(intervalos)[validos] * tamanho
+    indices = np.unique(np.concatenate((
+        base + np.nanargmin(blocos[validos], axis=1),
+        base + np.nanargmax(blocos[validos], axis=1),
+    )))
+    return x[indices], y[indices]
+
+
+def _serie(resultado, serie):
+    if serie == SERIE_VALOR:
+        if np.isnan(resultado.valores_iniciais).any():
+            raise ValueError("A série 'Valor' exige valor inicial em todos os esquemas.")
+        return resultado.valores
+    if serie == COL_RED_ACUM:
+        return resultado.reducao_acum_pct
+    if serie == COL_RED_ENTRE:
+        return resultado.reducoes_pct
+    if serie == COL_FATOR:
+        return resultado.fator_restante
+    raise ValueError(f"Série desconhecida: {serie}")
+
+
+def spec_grafico(ids, resultado, num_passes, serie=COL_RED_ACUM, rotulo_valor=None,
+                 max_pontos=MAX_PONTOS_GRAFICO):
+    """
+    Especificação Vega-Lite (dict) de um único gráfico de linhas com um esquema
+    por cor. Cada série é reduzida para caber em `max_pontos` no total.
+    """
+    dados = _serie(resultado, serie)
+    rotulo = rotulo_valor or serie
+    por_serie = max(max_pontos // max(resultado.num_esquemas, 1), 4)
+    valores = []
+    for i, ident in enumerate(ids):
+        n = int(num_passes[i])
+        x, y = reduzir_serie(np.arange(1, n + 1), dados[i, :n], por_serie)
+        valores.extend({"Esquema": ident, "Passe": int(p), rotulo: float(v)} for p, v in zip(x, y))
+    return {
+        "data": {"values": valores},
+        "mark": {"type": "line", "point": len(valores) <= 500},
+        "encoding": {
+            "x": {"field": "Passe", "type": "quantitative", "axis": {"tickMinStep": 1}},
+            "y": {"field": rotulo, "type": "quantitative", "scale": {"zero": False}},
+            "color": {"field": "Esquema", "type": "nominal", "sort": None},
+            "tooltip": [{"field": "Esquema"}, {"field": "Passe"}, {"field": rotulo, "format": ".4f"}],
+        },
+        "height": 360,
+    }
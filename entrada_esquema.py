@@ -0,0 +1,165 @@
+"""
+Leitura de um esquema inteiro de reduções colado ou carregado de arquivo.
+
+Aceita texto (colado de planilha ou digitado), CSV/TXT e Excel (.xlsx); o
+conteúdo de arquivos CSV/TXT é lido exatamente como o texto colado:
+
+* texto: valores separados por quebra de linha, tabulação, ";" ou espaço;
+  a vírgula é decimal quando os valores já vêm separados assim ("30,5;28") e
+  separador em listas ("30,28,25"); "30,28" sozinho é ambíguo e é recusado;
+  "%" é ignorado;
+* tabela (texto com linha de cabeçalho ou Excel): a coluna "Redução (%)"
+  exportada pelo aplicativo, colunas `passe_<k>` do formato de lote (um único
+  esquema) ou a primeira coluna numérica.
+
+Valores não numéricos ou não finitos e células vazias entre reduções geram
+ValueError indicando onde estão, em vez de serem descartados.
+"""
+
+import io
+import re
+
+import numpy as np
+
+from calculo_bitola import colunas_de_passe
+
+COL_REDUCAO = "Redução (%)"
+COL_RED_ENTRE = "Redução entre passes (%)"
+_SEPARADORES = re.compile(r"[\s;]+")
+
+
+def _numero(token):
+    return float(token.strip().replace("%", ""))
+
+
+def _tokens(texto):
+    """
+    Valores de um texto, já com ponto decimal. Quebra de linha, tabulação,
+    espaço e ";" separam valores; a vírgula separa valores quando aparece como
+    delimitador ("30,28,25", "30, 28") e é decimal quando os valores já estão
+    separados de outra forma ("30,5;28" ou um por linha). ValueError quando o
+    papel da vírgula é ambíguo ("30,28" sozinho, ou misturado a uma lista).
+    """
+    partes = [p for p in _SEPARADORES.split(texto.strip()) if p]
+    ambiguas = [p for p in partes if p.count(",") == 1 and not p.startswith(",") and not p.endswith(",")]
+    virgula_delimita = any(p.startswith(",") or p.endswith(",") or p.count(",") > 1 for p in partes)
+    if ambiguas and (virgula_delimita or len(partes) == 1):
+        raise ValueError(f"'{ambiguas[0]}' é ambíguo: use ponto decimal (30.5) ou separe os passes "
+                         "com ; ou quebra de linha (30;28).")
+    if virgula_delimita:
+        return [t for p in partes for t in p.split(",") if t]
+    return [p.replace(",", ".") for p in partes]
+
+
+def _eh_cabecalho(linha):
+    try:
+        for token in re.split(r"[\s;,]+", linha.strip()):
+            if token:
+                _numero(token)
+    except ValueError:
+        return True
+    return False
+
+
+def _tabela_de_texto(texto, cabecalho):
+    """Tabela de um texto com cabeçalho; o separador (tabulação, ";" ou ",") vem da primeira linha."""
+    import pandas as pd
+
+    separador = max(("\t", ";", ","), key=cabecalho.count)
+    decimal = "," if separador != "," else "."
+    return pd.read_csv(io.StringIO(texto), sep=separador, decimal=decimal)
+
+
+def reducoes_de_texto(texto):
+    """Reduções (%) de um texto colado, com ou sem cabeçalho; ValueError se houver valor inválido ou fora de 0–100."""
+    primeira = texto.strip().split("\n", 1)[0]
+    if primeira and _eh_cabecalho(primeira):
+        return reducoes_de_tabela(_tabela_de_texto(texto.strip(), primeira))
+    tokens = _tokens(texto)
+    try:
+        reducoes = np.array([_numero(t) for t in tokens], dtype=np.float64)
+    except ValueError:
+        raise ValueError("O texto colado contém valores que não são números.") from None
+    return _validar(reducoes)
+
+
+def _validar(reducoes):
+    if reducoes.size == 0:
+        raise ValueError("Nenhuma redução encontrada.")
+    if not np.isfinite(reducoes).all():
+        raise ValueError("As reduções por passe devem ser números finitos.")
+    if ((reducoes < 0.0) | (reducoes > 100.0)).any():
+        raise ValueError("As reduções por passe devem estar entre 0 e 100%.")
+    return reducoes
+
+
+def _celulas(valores, rotulos):
+    """
+    Reduções de uma sequência de células: vazias no início e no fim são
+    ignoradas; célula inválida ou vazia entre reduções gera ValueError com os
+    rótulos (linhas ou colunas) afetados.
+    """
+    reducoes = np.full(len(valores), np.nan)
+    invalidas = []
+    for i, (rotulo, valor) in enumerate(zip(rotulos, valores)):
+        if isinstance(valor, str):
+            valor = valor.strip()
+            if not valor:
+                continue
+            try:
+                reducoes[i] = _numero(valor.replace(",", ".") if valor.count(",") == 1 else valor)
+            except ValueError:
+                invalidas.append(rotulo)
+        elif valor is not None:
+            reducoes[i] = float(valor)
+    if invalidas:
+        raise ValueError(f"Valores que não são números em: {', '.join(map(str, invalidas[:10]))}.")
+
+    preenchidas = np.flatnonzero(~np.isnan(reducoes))
+    if preenchidas.size == 0:
+        return reducoes[:0]
+    reducoes = reducoes[preenchidas[0]:preenchidas[-1] + 1]
+    vazias = np.flatnonzero(np.isnan(reducoes)) + preenchidas[0]
+    if vazias.size:
+        raise ValueError(f"Célula vazia entre reduções em: {', '.join(str(rotulos[i]) for i in vazias[:10])}.")
+    return reducoes
+
+
+def reducoes_de_tabela(tabela):
+    """
+    Reduções (%) de uma tabela (pandas) em um dos formatos aceitos. No formato
+    `passe_<k>` a tabela deve ter um único esquema (uma linha).
+    """
+    import pandas as pd
+
+    cols_passe = colunas_de_passe(tabela.columns)
+    if cols_passe:
+        if len(tabela) != 1:
+            raise ValueError(f"O arquivo tem {len(tabela)} esquemas (colunas passe_<k>); carregue um esquema por "
+                             "vez ou use a comparação de esquemas.")
+        return _validar(_celulas(tabela[cols_passe].iloc[0].tolist(), cols_passe))
+    if COL_REDUCAO in tabela:
+        serie = tabela[COL_REDUCAO]
+    elif COL_RED_ENTRE in tabela:
+        serie = tabela[COL_RED_ENTRE]
+    else:
+        numericas = [c for c in tabela.columns if pd.api.types.is_numeric_dtype(tabela[c])]
+        if not numericas:
+            raise ValueError("Nenhuma coluna numérica de reduções encontrada.")
+        serie = tabela[numericas[0]]
+    # linhas do arquivo: a 1 é o cabeçalho
+    rotulos = [f"linha {i + 2}" for i in range(len(serie))]
+    return _validar(_celulas(serie.tolist(), rotulos))
+
+
+def reducoes_de_arquivo(nome, conteudo):
+    """Reduções (%) de um arquivo carregado (CSV, TXT ou Excel .xlsx), pelo nome e bytes."""
+    if nome.lower().endswith(".xlsx"):
+        import pandas as pd
+
+        try:
+            tabela = pd.read_excel(io.BytesIO(conteudo))
+        except ImportError:
+            raise ValueError("Leitura de Excel requer o pacote openpyxl.") from None
+        return reducoes_de_tabela(tabela)
+    return reducoes_de_texto(conteudo.decode("utf-8-sig", errors="replace"))
@@ -0,0 +1,136 @@
+"""
+Tensão, força e potência de trefilação por passe (solução de Sachs).
+
+Para cada passe, com deformação verdadeira ε = ln(A₀/A₁):
+
+    σ̄   = ∫σ(ε)dε / Δε                       tensão de escoamento média no passe
+    σ_t = σ̄ · (1 + B)/B · [1 − (A₁/A₀)^B]     tensão de trefilação, B = μ·cot α
+    F   = σ_t · A₁                            força de trefilação
+    P   = F · v₁                              potência (v₁ pela constância de volume)
+
+A curva de escoamento (Hollomon, σ = K·(ε₀ + ε)ⁿ) é integrada uma única vez por
+material em uma tabela de consulta, e os esquemas são avaliados por
+interpolação vetorizada — um esquema ou um lote inteiro de uma vez.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from calculo_bitola import GRANDEZA_AREA, calcular_lote, diametro_para_area
+
+# Faixa e resolução das tabelas de integral da curva de escoamento
+DEFORMACAO_MAXIMA = 8.0
+PONTOS_TABELA = 8193
+
+
+@dataclass(frozen=True)
+class Material:
+    """Curva de escoamento de Hollomon: σ = K·(ε₀ + ε)ⁿ, com K em MPa."""
+
+    nome: str
+    K: float
+    n: float
+    eps0: float = 0.0
+
+    def tensao_escoamento(self, deformacao):
+        return self.K * (self.eps0 + np.asarray(deformacao, dtype=np.float64)) ** self.n
+
+
+# Valores típicos de literatura; ajuste para o material e o estado de fornecimento reais
+MATERIAIS = {
+    m.nome: m for m in (
+        Material("Aço baixo carbono (SAE 1010)", K=530.0, n=0.26),
+        Material("Aço médio carbono (SAE 1045)", K=965.0, n=0.14),
+        Material("Aço alto carbono (SAE 1070)", K=1300.0, n=0.15),
+        Material("Aço inox (AISI 304)", K=1275.0, n=0.45),
+        Material("Cobre recozido", K=320.0, n=0.54),
+        Material("Alumínio (1100-O)", K=180.0, n=0.20),
+    )
+}
+
+
+@lru_cache(maxsize=64)
+def tabela_integral(material):
+    """
+    Tabela (ε, ∫₀^ε σ dε) do material em grade uniforme, por regra do trapézio;
+    calculada uma vez por material e reaproveitada em todas as consultas.
+    """
+    deformacoes = np.linspace(0.0, DEFORMACAO_MAXIMA, PONTOS_TABELA)
+    tensoes = material.tensao_escoamento(deformacoes)
+    integral = np.concatenate(([0.0], np.cumsum((tensoes[1:] + tensoes[:-1]) * 0.5 * np.diff(deformacoes))))
+    deformacoes.flags.writeable = False
+    integral.flags.writeable = False
+    return deformacoes, integral
+
+
+@dataclass(frozen=True)
+class ResultadoEsforcos:
+    """Resultados por passe, arrays (m, n); tensões em MPa, força em N, potência em kW."""
+
+    deformacao: np.ndarray          # deformação verdadeira acumulada ao fim do passe
+    tensao_media: np.ndarray        # σ̄ no passe
+    tensao_trefilacao: np.ndarray   # σ_t
+    forca_N: np.ndarray
+    potencia_kW: np.ndarray
+    razao_tracao: np.ndarray        # σ_t / σ de escoamento do fio na saída
+
+    def acima_do_limite(self, limite):
+        """Passes cuja razão de tração supera o limite (risco de ruptura)."""
+        return self.razao_tracao > limite
+
+
+def calcular_esforcos(reducoes_pct, valores_iniciais, grandeza, material, angulo_graus=6.0,
+                      atrito=0.05, velocidade_final=10.0):
+    """
+    Avalia tensão, força e potência de trefilação por passe de um lote de esquemas.
+
+    `angulo_graus` é o semiângulo da fieira, `atrito` o coeficiente de Coulomb e
+    `velocidade_final` a velocidade do fio na última fieira (m/s). Os valores
+    iniciais são diâmetros (mm) ou áreas (mm²), conforme `grandeza`.
+    """
+    if not 0.0 < angulo_graus < 90.0:
+        raise ValueError("O semiângulo da fieira deve estar entre 0 e 90 graus.")
+    if atrito <= 0.0:
+        raise ValueError("O coeficiente de atrito deve ser positivo.")
+
+    resultado = calcular_lote(reducoes_pct, valores_iniciais)
+    if np.isnan(resultado.valores_iniciais).any():
+        raise ValueError("O cálculo de esforços exige valor inicial em todos os esquemas.")
+    if grandeza == GRANDEZA_AREA:
+        areas_iniciais, areas = resultado.valores_iniciais, resultado.valores
+    else:
+        areas_iniciais, areas = diametro_para_area(resultado.valores_iniciais), diametro_para_area(resultado.valores)
+
+    # Deformação verdadeira acumulada: ε_k = −ln F_k (fator restante em área)
+    with np.errstate(divide="ignore"):
+        eps = np.log(areas_iniciais[:, np.newaxis] / areas)
+    eps_antes = np.concatenate((np.zeros((eps.shape[0], 1)), eps[:, :-1]), axis=1)
+    delta = eps - eps_antes
+
+    deformacoes, integral = tabela_integral(material)
+    if (eps > DEFORMACAO_MAXIMA).any():
+        raise ValueError(f"Deformação acumulada acima de {DEFORMACAO_MAXIMA:g} (fora da tabela do material).")
+    trabalho = np.interp(eps, deformacoes, integral) - np.interp(eps_antes, deformacoes, integral)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tensao_media = np.where(delta > 0.0, trabalho / delta, material.tensao_escoamento(eps))
+
+    b = atrito / np.tan(np.radians(angulo_graus))
+    razao_areas = np.exp(-delta)  # A₁/A₀ do passe
+    tensao = tensao_media * (1.0 + b) / b * (1.0 - razao_areas ** b)
+    forca = tensao * areas  # MPa · mm² = N
+
+    velocidades = velocidade_final * areas[:, -1:] / areas  # constância de volume
+    potencia = forca * velocidades / 1000.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        razao = tensao / material.tensao_escoamento(eps)
+
+    return ResultadoEsforcos(
+        deformacao=eps,
+        tensao_media=tensao_media,
+        tensao_trefilacao=tensao,
+        forca_N=forca,
+        potencia_kW=potencia,
+        razao_tracao=razao,
+    )
@@ -0,0 +1,136 @@
+"""
+Esquema de passes editável com índice de produtos por faixa (árvore de segmentos).
+
+A árvore guarda somas de ln(1 - rᵢ) — o produto ∏(1 - rᵢ) em espaço
+logarítmico, como em `calculo_bitola` — de modo que:
+
+* alterar a redução de um passe custa O(log n);
+* o fator acumulado até um passe, o valor final e a redução entre dois passes
+  quaisquer ("do passe 4 ao 11") saem de uma consulta O(log n);
+* após uma alteração no passe k, só os passes k..n mudam de valor acumulado.
+"""
+
+import numpy as np
+
+from calculo_bitola import calcular_lote
+
+
+def _log_fator(reducoes_pct):
+    with np.errstate(divide="ignore"):
+        return np.log1p(-np.asarray(reducoes_pct, dtype=np.float64) / 100.0)
+
+
+class EsquemaIncremental:
+    """Esquema de reduções (%) com atualização e consultas por faixa em O(log n)."""
+
+    def __init__(self, reducoes_pct, valor_inicial=None):
+        reducoes = np.array(reducoes_pct, dtype=np.float64).ravel()
+        if ((reducoes < 0.0) | (reducoes > 100.0) | np.isnan(reducoes)).any():
+            raise ValueError("As reduções por passe devem estar entre 0 e 100%.")
+
+        self.valor_inicial = float(valor_inicial) if valor_inicial and valor_inicial > 0 else None
+        self._reducoes = reducoes
+        self._n = reducoes.size
+        self._folhas = 1
+        while self._folhas < max(self._n, 1):
+            self._folhas *= 2
+        # Árvore implícita: nó i tem filhos 2i e 2i + 1; folhas em [folhas, 2·folhas)
+        self._arvore = np.zeros(2 * self._folhas)
+        self._arvore[self._folhas:self._folhas + self._n] = _log_fator(reducoes)
+        # Construção nível a nível (vetorizada), das folhas até a raiz
+        nivel = self._folhas // 2
+        while nivel:
+            filhos = self._arvore[2 * nivel:4 * nivel]
+            self._arvore[nivel:2 * nivel] = filhos[0::2] + filhos[1::2]
+            nivel //= 2
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def reducoes_pct(self):
+        return self._reducoes.copy()
+
+    def _checar_passe(self, passe):
+        if not 1 <= passe <= self._n:
+            raise IndexError(f"Passe {passe} fora do esquema (1 a {self._n}).")
+
+    def alterar(self, passe, reducao_pct):
+        """Altera a redução do passe (1 a n) em O(log n); retorna o primeiro passe afetado."""
+        self._checar_passe(passe)
+        reducao_pct = float(reducao_pct)
+        if not 0.0 <= reducao_pct <= 100.0:
+            raise ValueError("As reduções por passe devem estar entre 0 e 100%.")
+        self._reducoes[passe - 1] = reducao_pct
+        i = self._folhas + passe - 1
+        self._arvore[i] = _log_fator(reducao_pct)
+        i //= 2
+        while i:
+            self._arvore[i] = self._arvore[2 * i] + self._arvore[2 * i + 1]
+            i //= 2
+        return passe
+
+    def _soma(self, inicio, fim):
+        """Σ ln(1 - rᵢ) dos passes inicio..fim (1-based, inclusive)."""
+        total = 0.0
+        esq, dir_ = self._folhas + inicio - 1, self._folhas + fim
+        while esq < dir_:
+            if esq & 1:
+                total += self._arvore[esq]
+                esq += 1
+            if dir_ & 1:
+                dir_ -= 1
+                total += self._arvore[dir_]
+            esq //= 2
+            dir_ //= 2
+        return total
+
+    def fator(self, inicio=1, fim=None):
+        """Fator restante dos passes inicio..fim: ∏(1 - rᵢ)."""
+        fim = self._n if fim is None else fim
+        if fim < inicio:
+            return 1.0
+        self._checar_passe(inicio)
+        self._checar_passe(fim)
+        return float(np.exp(self._soma(inicio, fim)))
+
+    def reducao_pct(self, inicio=1, fim=None):
+        """Redução (%) acumulada entre os passes inicio e fim, inclusive."""
+        fim = self._n if fim is None else fim
+        if fim < inicio:
+            return 0.0
+        self._checar_passe(inicio)
+        self._checar_passe(fim)
+        return float(0.0 - np.expm1(self._soma(inicio, fim)) * 100.0)
+
+    @property
+    def fator_total(self):
+        return float(np.exp(self._arvore[1])) if self._n else 1.0
+
+    @property
+    def reducao_total_pct(self):
+        return float(0.0 - np.expm1(self._arvore[1]) * 100.0) if self._n else 0.0
+
+    def valor(self, passe):
+        """Valor (diâmetro/área) após o passe; None sem valor inicial."""
+        if self.valor_inicial is None:
+            return None
+        return self.valor_inicial * self.fator(1, passe)
+
+    @property
+    def valor_final(self):
+        return None if self.valor_inicial is None else self.valor_inicial * self.fator_total
+
+    def acumulados_desde(self, passe):
+        """
+        ln do fator acumulado dos passes passe..n: uma consulta O(log n) para o
+        prefixo e uma soma acumulada só sobre os passes afetados.
+        """
+        self._checar_passe(passe)
+        base = self._soma(1, passe - 1) if passe > 1 else 0.0
+        folhas = self._arvore[self._folhas + passe - 1:self._folhas + self._n]
+        return base + np.cumsum(folhas)
+
+    def como_resultado(self):
+        """`ResultadoLote` equivalente (recalcula o esquema inteiro)."""
+        return calcular_lote(self._reducoes.reshape(1, -1), self.valor_inicial)
@@ -0,0 +1,96 @@
+"""
+Catálogo de fieiras padronizadas e ajuste ("snap") dos passes à fieira mais próxima.
+
+O catálogo mantém os diâmetros em um array ordenado (um por classe de
+tolerância), e cada consulta é uma busca binária (`np.searchsorted`), O(log n),
+vetorizada sobre quantos diâmetros forem pedidos de uma vez.
+"""
+
+import numpy as np
+
+from calculo_bitola import GRANDEZA_AREA, area_para_diametro, calcular_lote, diametro_para_area
+
+COL_DIAMETRO = "diametro"
+COL_CLASSE = "classe"
+
+
+class CatalogoFieiras:
+    """Índice ordenado de diâmetros de fieiras disponíveis (mm)."""
+
+    def __init__(self, diametros, classes=None):
+        diametros = np.asarray(diametros, dtype=np.float64)
+        if diametros.ndim != 1 or diametros.size == 0:
+            raise ValueError("O catálogo de fieiras deve ter ao menos um diâmetro.")
+        if np.isnan(diametros).any() or (diametros <= 0.0).any():
+            raise ValueError("Os diâmetros do catálogo devem ser positivos.")
+        if classes is None:
+            classes = np.full(diametros.size, "", dtype=object)
+        classes = np.asarray(classes, dtype=object)
+
+        ordem = np.argsort(diametros, kind="stable")
+        self.diametros = diametros[ordem]
+        self.classes = classes[ordem]
+        # Um índice por classe de tolerância, para consultas restritas a uma classe
+        self._por_classe = {
+            str(c): self.diametros[self.classes.astype(str) == c] for c in np.unique(self.classes.astype(str))
+        }
+
+    def __len__(self):
+        return self.diametros.size
+
+    @property
+    def classes_disponiveis(self):
+        return sorted(self._por_classe)
+
+    @classmethod
+    def de_csv(cls, origem, coluna_diametro=COL_DIAMETRO, coluna_classe=COL_CLASSE):
+        """Carrega o catálogo de um CSV (caminho ou arquivo) com colunas `diametro` e, opcionalmente, `classe`."""
+        import pandas as pd
+
+        df = pd.read_csv(origem)
+        if coluna_diametro not in df:
+            raise ValueError(f"Coluna '{coluna_diametro}' não encontrada no catálogo.")
+        classes = df[coluna_classe].astype(str).to_numpy() if coluna_classe in df else None
+        return cls(df[coluna_diametro].to_numpy(dtype=np.float64), classes)
+
+    def _indice(self, classe):
+        if classe is None:
+            return self.diametros
+        try:
+            return self._por_classe[str(classe)]
+        except KeyError:
+            raise ValueError(f"Classe de tolerância inexistente no catálogo: {classe!r}.") from None
+
+    def mais_proxima(self, diametros, classe=None):
+        """Diâmetro de fieira mais próximo de cada diâmetro pedido (qualquer forma; NaN é preservado)."""
+        indice = self._indice(classe)
+        d = np.asarray(diametros, dtype=np.float64)
+        if indice.size == 1:
+            return np.where(np.isnan(d), np.nan, indice[0])
+        # Vizinhos de cada diâmetro no índice ordenado: indice[pos - 1] ≤ d ≤ indice[pos]
+        pos = np.clip(np.searchsorted(indice, d), 1, indice.size - 1)
+        abaixo = indice[pos - 1]
+        acima = indice[pos]
+        proxima = np.where(np.abs(d - abaixo) <= np.abs(acima - d), abaixo, acima)
+        return np.where(np.isnan(d), np.nan, proxima)
+
+    def ajustar_resultado(self, resultado, grandeza, classe=None):
+        """
+        Ajusta cada passe de um `ResultadoLote` à fieira mais próxima.
+
+        Retorna `(valores_ajustados, reducoes_reais_pct)`, ambos (m, n), na
+        grandeza do esquema; as reduções reais são recalculadas a partir dos
+        valores ajustados (o valor inicial do fio-máquina não é ajustado).
+        """
+        if grandeza == GRANDEZA_AREA:
+            ajustados = diametro_para_area(self.mais_proxima(area_para_diametro(resultado.valores), classe))
+        else:
+            ajustados = self.mais_proxima(resultado.valores, classe)
+
+        anteriores = np.concatenate((resultado.valores_iniciais[:, np.newaxis], ajustados[:, :-1]), axis=1)
+        reducoes_reais = (1.0 - ajustados / anteriores) * 100.0
+        return ajustados, reducoes_reais
+
+    def ajustar_lote(self, reducoes_pct, valores_iniciais, grandeza, classe=None):
+        """Calcula um lote de esquemas e ajusta seus passes (ver `ajustar_resultado`)."""
+        return self.ajustar_resultado(calcular_lote(reducoes_pct, valores_iniciais), grandeza, classe)
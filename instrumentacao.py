@@ -0,0 +1,85 @@
+"""
+Cronometragem opcional das etapas de cada execução (rerun) do aplicativo.
+
+Uso:
+    cron = Cronometro(ativo=True, historico=st.session_state.setdefault("tempos", {}))
+    with cron.etapa("calculo"):
+        ...
+    cron.finalizar()
+
+Desativado, `etapa` devolve sempre o mesmo contexto vazio, sem medir nada.
+O histórico guarda os últimos `janela` tempos de cada etapa para os percentis
+móveis da sessão e pode ser exportado em CSV ou JSON.
+"""
+
+import json
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+
+ETAPA_TOTAL = "total"
+PERCENTIS = (50, 90, 99)
+_NULO = nullcontext()
+
+
+class Cronometro:
+    """Mede o tempo (ms) de etapas nomeadas e acumula um histórico móvel por etapa."""
+
+    def __init__(self, ativo=False, historico=None, janela=500):
+        self.ativo = ativo
+        self.historico = historico if historico is not None else {}
+        self.janela = janela
+        self.ultima = {}  # tempos da execução corrente
+        self._inicio = time.perf_counter() if ativo else None
+
+    def etapa(self, nome):
+        """Contexto que mede a etapa `nome` (sem custo quando desativado)."""
+        if not self.ativo:
+            return _NULO
+        return self._medir(nome)
+
+    @contextmanager
+    def _medir(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._registrar(nome, (time.perf_counter() - inicio) * 1000.0)
+
+    def _registrar(self, nome, ms):
+        self.ultima[nome] = self.ultima.get(nome, 0.0) + ms
+
+    def finalizar(self):
+        """Fecha a execução: registra o total e envia os tempos ao histórico."""
+        if not self.ativo:
+            return
+        self.ultima[ETAPA_TOTAL] = (time.perf_counter() - self._inicio) * 1000.0
+        for nome, ms in self.ultima.items():
+            self.historico.setdefault(nome, deque(maxlen=self.janela)).append(ms)
+
+    def resumo(self):
+        """Lista de registros por etapa: última medição, média e percentis móveis (ms)."""
+        registros = []
+        for nome, tempos in self.historico.items():
+            if not tempos:
+                continue
+            valores = np.fromiter(tempos, dtype=np.float64)
+            registro = {"etapa": nome, "ultima_ms": self.ultima.get(nome), "n": valores.size,
+                        "media_ms": float(valores.mean())}
+            for p, v in zip(PERCENTIS, np.percentile(valores, PERCENTIS)):
+                registro[f"p{p}_ms"] = float(v)
+            registros.append(registro)
+        return registros
+
+    def exportar_csv(self):
+        campos = ["etapa", "ultima_ms", "n", "media_ms"] + [f"p{p}_ms" for p in PERCENTIS]
+        linhas = [",".join(campos)]
+        for registro in self.resumo():
+            linhas.append(",".join("" if registro[c] is None else str(registro[c]) for c in campos))
+        return ("\n".join(linhas) + "\n").encode("utf-8")
+
+    def exportar_json(self):
+        dados = {"resumo": self.resumo(), "historico": {k: list(v) for k, v in self.historico.items()}}
+        return json.dumps(dados, ensure_ascii=False, indent=2).encode("utf-8")
@@ -0,0 +1,157 @@
+"""
+Análise de tolerância e desgaste de fieiras por Monte Carlo.
+
+Cada amostra é uma bobina: o diâmetro do fio-máquina varia em torno do
+nominal e o diâmetro de saída de cada passe é o da fieira, que varia pela
+tolerância de fabricação (normal) e pelo desgaste acumulado (uniforme entre
+zero e o desgaste máximo). As amostras são geradas em blocos de tamanho fixo
+e resumidas em histogramas por passe, de modo que a memória não depende do
+número total de bobinas; os blocos podem ser distribuídos entre processos.
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from calculo_bitola import GRANDEZA_AREA, area_para_diametro, calcular_esquema, diametro_para_area
+
+PERCENTIS_PADRAO = (5.0, 50.0, 95.0)
+NUM_CLASSES_HISTOGRAMA = 4096
+
+
+@dataclass(frozen=True)
+class ResultadoMonteCarlo:
+    """Percentis por passe (índice 0 = fio-máquina) de um conjunto de bobinas simuladas."""
+
+    percentis: tuple
+    valores: np.ndarray           # (len(percentis), n + 1) na grandeza do esquema
+    reducao_acum_pct: np.ndarray  # (len(percentis), n + 1)
+    num_amostras: int
+
+    def faixa(self, percentil):
+        """Valores e redução acumulada por passe do percentil pedido."""
+        i = self.percentis.index(percentil)
+        return self.valores[i], self.reducao_acum_pct[i]
+
+
+def _por_passe(parametro, n):
+    return np.broadcast_to(np.asarray(parametro, dtype=np.float64), (n,))
+
+
+def _amostrar(rng, tamanho, d_nominal, desvio_fio, desvio_fieira, desgaste_max):
+    """Diâmetros simulados (tamanho, n + 1): coluna 0 é o fio-máquina."""
+    n = d_nominal.size - 1
+    d = np.empty((tamanho, n + 1))
+    d[:, 0] = d_nominal[0] + desvio_fio * rng.standard_normal(tamanho)
+    d[:, 1:] = (d_nominal[1:] + desvio_fieira * rng.standard_normal((tamanho, n))
+                + desgaste_max * rng.random((tamanho, n)))
+    return d
+
+
+def _grandezas(d, grandeza):
+    """Valores na grandeza do esquema e redução acumulada (%), a partir dos diâmetros."""
+    valores = diametro_para_area(d) if grandeza == GRANDEZA_AREA else d
+    reducao = (1.0 - valores / valores[:, :1]) * 100.0
+    return valores, reducao
+
+
+def _histograma(x, limites):
+    """Contagens por classe de cada coluna de `x`, em uma única chamada a bincount."""
+    inferior, largura = limites
+    n = x.shape[1]
+    classe = np.clip(((x - inferior) / largura).astype(np.int64), 0, NUM_CLASSES_HISTOGRAMA - 1)
+    classe += np.arange(n) * NUM_CLASSES_HISTOGRAMA
+    return np.bincount(classe.ravel(), minlength=n * NUM_CLASSES_HISTOGRAMA).reshape(n, NUM_CLASSES_HISTOGRAMA)
+
+
+def _simular_bloco(semente, tamanho, d_nominal, desvio_fio, desvio_fieira, desgaste_max,
+                   grandeza, limites_valor, limites_reducao):
+    rng = np.random.default_rng(semente)
+    valores, reducao = _grandezas(
+        _amostrar(rng, tamanho, d_nominal, desvio_fio, desvio_fieira, desgaste_max), grandeza,
+    )
+    return _histograma(valores, limites_valor), _histograma(reducao, limites_reducao)
+
+
+def _limites(amostra):
+    """Faixa das classes por passe, com folga em torno de um bloco piloto."""
+    minimo, maximo = amostra.min(axis=0), amostra.max(axis=0)
+    folga = np.maximum(maximo - minimo, 1e-12)
+    inferior = minimo - folga
+    largura = 3.0 * folga / NUM_CLASSES_HISTOGRAMA
+    return inferior, largura
+
+
+def _percentis_histograma(contagens, limites, percentis):
+    inferior, largura = limites
+    acumulado = np.cumsum(contagens, axis=1)
+    total = acumulado[:, -1:]
+    saida = np.empty((len(percentis), contagens.shape[0]))
+    for i, p in enumerate(percentis):
+        alvo = p / 100.0 * total
+        classe = np.minimum((acumulado < alvo).sum(axis=1), NUM_CLASSES_HISTOGRAMA - 1)
+        # Interpolação linear dentro da classe
+        antes = np.where(classe > 0, np.take_along_axis(acumulado, (classe - 1)[:, None], 1)[:, 0], 0)
+        dentro = np.take_along_axis(contagens, classe[:, None], 1)[:, 0]
+        fracao = np.where(dentro > 0, (alvo[:, 0] - antes) / np.maximum(dentro, 1), 0.5)
+        saida[i] = inferior + (classe + fracao) * largura
+    return saida
+
+
+def simular(reducoes_pct, valor_inicial, grandeza, desvio_fio=0.0, desvio_fieira=0.0,
+            desgaste_max=0.0, num_amostras=1_000_000, tamanho_bloco=100_000,
+            percentis=PERCENTIS_PADRAO, processos=1, semente=None):
+    """
+    Simula `num_amostras` bobinas para o esquema informado.
+
+    Desvios e desgaste são dados em mm de diâmetro; `desvio_fieira` e
+    `desgaste_max` podem ser escalares ou um valor por passe. Os percentis são
+    estimados por histogramas com `NUM_CLASSES_HISTOGRAMA` classes por passe.
+    """
+    if not (valor_inicial and valor_inicial > 0):
+        raise ValueError("A simulação exige um valor inicial positivo.")
+    if num_amostras < 1 or tamanho_bloco < 1:
+        raise ValueError("Número de amostras e tamanho do bloco devem ser positivos.")
+
+    nominal = calcular_esquema(reducoes_pct, valor_inicial)
+    n = nominal.num_passes
+    v_nominal = np.concatenate(([valor_inicial], nominal.valores[0]))
+    d_nominal = area_para_diametro(v_nominal) if grandeza == GRANDEZA_AREA else v_nominal
+    parametros = (d_nominal, float(desvio_fio), _por_passe(desvio_fieira, n), _por_passe(desgaste_max, n))
+
+    # Bloco piloto define a faixa dos histogramas
+    sementes = np.random.SeedSequence(semente).spawn(math.ceil(num_amostras / tamanho_bloco) + 1)
+    piloto = _grandezas(_amostrar(np.random.default_rng(sementes[0]), min(tamanho_bloco, 10_000), *parametros),
+                        grandeza)
+    limites_valor, limites_reducao = _limites(piloto[0]), _limites(piloto[1])
+
+    tamanhos = [tamanho_bloco] * (num_amostras // tamanho_bloco)
+    if num_amostras % tamanho_bloco:
+        tamanhos.append(num_amostras % tamanho_bloco)
+    args = [(s, t, *parametros, grandeza, limites_valor, limites_reducao) for s, t in zip(sementes[1:], tamanhos)]
+
+    hist_valor = np.zeros((n + 1, NUM_CLASSES_HISTOGRAMA), dtype=np.int64)
+    hist_reducao = np.zeros_like(hist_valor)
+    if processos and processos > 1:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            blocos = executor.map(_simular_bloco, *zip(*args))
+            for hv, hr in blocos:
+                hist_valor += hv
+                hist_reducao += hr
+    else:
+        for a in args:
+            hv, hr = _simular_bloco(*a)
+            hist_valor += hv
+            hist_reducao += hr
+
+    percentis = tuple(float(p) for p in percentis)
+    reducao_acum = _percentis_histograma(hist_reducao, limites_reducao, percentis)
+    reducao_acum[:, 0] = 0.0  # fio-máquina: sem redução por definição
+    return ResultadoMonteCarlo(
+        percentis=percentis,
+        valores=_percentis_histograma(hist_valor, limites_valor, percentis),
+        reducao_acum_pct=reducao_acum,
+        num_amostras=num_amostras,
+    )
@@ -0,0 +1,189 @@
+"""
+Otimizador de esquemas de passes com restrições.
+
+Dado o valor inicial e o valor alvo (diâmetro ou área), a faixa de número de
+passes, a redução máxima por passe e a regra r₁ ≥ r₂ ≥ … ≥ rₙ, procura por
+branch-and-bound, sobre reduções discretizadas, os melhores esquemas viáveis.
+
+A busca trabalha em espaço logarítmico: o esquema atinge o alvo quando
+Σ ln(1 - rᵢ) ≈ ln(V_alvo / V₀), dentro da tolerância informada.
+"""
+
+import heapq
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+OBJETIVOS = {
+    "uniforme": "Carga mais uniforme (menor diferença entre r₁ e rₙ)",
+    "menor_maximo": "Menor redução máxima por passe",
+    "menos_passes": "Menor número de passes",
+}
+
+
+@dataclass(frozen=True)
+class SolucaoEsquema:
+    """Esquema viável encontrado pelo otimizador."""
+
+    reducoes_pct: tuple
+    valor_final: float
+    erro_pct: float  # desvio do valor final em relação ao alvo (%)
+
+    @property
+    def num_passes(self):
+        return len(self.reducoes_pct)
+
+    @property
+    def amplitude_pct(self):
+        """Diferença entre a maior e a menor redução do esquema."""
+        return self.reducoes_pct[0] - self.reducoes_pct[-1]
+
+
+def _reducao(nivel, passo_pct):
+    return round(nivel * passo_pct, 9)
+
+
+def _custo(objetivo, reducoes, erro):
+    amplitude = reducoes[0] - reducoes[-1]
+    if objetivo == "menor_maximo":
+        return (reducoes[0], amplitude, erro)
+    if objetivo == "menos_passes":
+        return (len(reducoes), amplitude, erro)
+    return (amplitude, erro)
+
+
+def _buscar_n_passes(n, alvo_log, tol_log, j_min, j_max, passo_pct, objetivo, max_solucoes,
+                     limite_inicial=math.inf):
+    """
+    Branch-and-bound para um número fixo de passes; retorna [(custo, níveis, soma)].
+
+    `limite_inicial` é o pior custo primário já aceito em buscas anteriores:
+    ramos que não podem ficar abaixo dele são descartados desde o início.
+    """
+    # Com n fixo, "menos passes" desempata pela uniformidade
+    if objetivo == "menos_passes":
+        objetivo = "uniforme"
+    logs = [math.log1p(-j * passo_pct / 100.0) for j in range(j_max + 1)]
+    melhores = []  # heap de máximo via custo negado: [(-custo, níveis, soma)]
+    escolhidos = []
+
+    def pior_custo():
+        if len(melhores) >= max_solucoes:
+            return min(-melhores[0][0][0], limite_inicial)
+        return limite_inicial
+
+    def registrar(soma):
+        reducoes = [_reducao(j, passo_pct) for j in escolhidos]
+        custo = _custo(objetivo, reducoes, abs(soma - alvo_log))
+        item = (tuple(-c for c in custo), tuple(escolhidos), soma)
+        if len(melhores) < max_solucoes:
+            heapq.heappush(melhores, item)
+        elif item > melhores[0]:
+            heapq.heapreplace(melhores, item)
+
+    def descer(restantes, j_teto, soma):
+        # Quanto ainda falta reduzir (em log) com `restantes` passes ≤ j_teto
+        falta = alvo_log - soma
+        r1 = escolhidos[0] * passo_pct
+        for j in range(j_teto, j_min - 1, -1):
+            # Limite inferior do objetivo para qualquer completamento
+            limite = r1 if objetivo == "menor_maximo" else r1 - j * passo_pct
+            if limite > pior_custo():
+                break
+            apos = falta - logs[j]
+            # Passa do alvo mesmo com os demais passes no mínimo: reduzir j
+            if apos > (restantes - 1) * logs[j_min] + tol_log:
+                continue
+            # Não alcança o alvo mesmo com os demais passes iguais a j: parar
+            if apos < (restantes - 1) * logs[j] - tol_log:
+                break
+            escolhidos.append(j)
+            if restantes == 1:
+                registrar(soma + logs[j])
+            else:
+                descer(restantes - 1, j, soma + logs[j])
+            escolhidos.pop()
+
+    # r₁ em ordem crescente a partir da redução uniforme: as primeiras soluções
+    # já são as mais equilibradas e apertam o limite para as seguintes
+    for j in range(j_min, j_max + 1):
+        if n * logs[j] > alvo_log + tol_log:
+            continue  # nem com todos os passes iguais a r₁ se chega ao alvo
+        if objetivo == "menor_maximo" and j * passo_pct > pior_custo():
+            break
+        if objetivo == "uniforme" and n > 1:
+            # O menor passe não passa da redução uniforme dos n - 1 restantes
+            rn_max = -math.expm1((alvo_log - logs[j] - tol_log) / (n - 1)) * 100.0
+            if j * passo_pct - rn_max > pior_custo() + passo_pct:
+                break
+        escolhidos.append(j)
+        if n == 1:
+            if abs(logs[j] - alvo_log) <= tol_log:
+                registrar(logs[j])
+        else:
+            descer(n - 1, j, logs[j])
+        escolhidos.pop()
+
+    return [(tuple(-c for c in custo), niveis, soma) for custo, niveis, soma in melhores]
+
+
+def otimizar_esquema(valor_inicial, valor_alvo, passes_min=1, passes_max=13,
+                     reducao_max_pct=30.0, reducao_min_pct=0.0, passo_pct=0.5,
+                     tolerancia_pct=0.5, objetivo="uniforme", max_solucoes=10, processos=1):
+    """
+    Procura os `max_solucoes` melhores esquemas decrescentes que levam
+    `valor_inicial` a `valor_alvo` (mesma grandeza), com reduções múltiplas de
+    `passo_pct` entre `reducao_min_pct` e `reducao_max_pct`, e valor final a
+    até `tolerancia_pct` % do alvo.
+
+    `processos` > 1 distribui os números de passes entre processos.
+    Retorna a lista de `SolucaoEsquema` ordenada pelo objetivo.
+    """
+    if objetivo not in OBJETIVOS:
+        raise ValueError(f"Objetivo desconhecido: {objetivo!r}.")
+    if not (valor_inicial > 0 and valor_alvo > 0):
+        raise ValueError("Os valores inicial e alvo devem ser positivos.")
+    if valor_alvo >= valor_inicial:
+        raise ValueError("O valor alvo deve ser menor que o valor inicial.")
+    if not (0.0 <= reducao_min_pct <= reducao_max_pct < 100.0):
+        raise ValueError("Faixa de redução por passe inválida (0 ≤ mín ≤ máx < 100%).")
+    if passo_pct <= 0 or passes_min < 1 or passes_max < passes_min:
+        raise ValueError("Passo de discretização ou faixa de passes inválidos.")
+
+    alvo_log = math.log(valor_alvo / valor_inicial)
+    tol_log = math.log1p(tolerancia_pct / 100.0)
+    j_min = math.ceil(reducao_min_pct / passo_pct - 1e-9)
+    j_max = math.floor(reducao_max_pct / passo_pct + 1e-9)
+
+    args = [(n, alvo_log, tol_log, j_min, j_max, passo_pct, objetivo, max_solucoes)
+            for n in range(passes_min, passes_max + 1)]
+    if processos and processos > 1:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            parciais = list(executor.map(_buscar_n_passes, *zip(*args)))
+    else:
+        parciais = []
+        limite = math.inf
+        for a in args:
+            parciais.append(_buscar_n_passes(*a, limite_inicial=limite))
+            encontrados = sorted(c[0][0] for p in parciais for c in p)
+            if len(encontrados) >= max_solucoes:
+                # Passes em ordem crescente: com "menos passes" basta o primeiro n com soluções
+                if objetivo == "menos_passes":
+                    break
+                limite = encontrados[max_solucoes - 1]
+
+    candidatos = []
+    for _, niveis, soma in (c for p in parciais for c in p):
+        reducoes = [_reducao(j, passo_pct) for j in niveis]
+        candidatos.append((_custo(objetivo, reducoes, abs(soma - alvo_log)), niveis, soma))
+    candidatos.sort(key=lambda c: c[0])
+
+    solucoes = []
+    for _, niveis, soma in candidatos[:max_solucoes]:
+        valor_final = valor_inicial * math.exp(soma)
+        solucoes.append(SolucaoEsquema(
+            reducoes_pct=tuple(_reducao(j, passo_pct) for j in niveis),
+            valor_final=valor_final,
+            erro_pct=(valor_final / valor_alvo - 1.0) * 100.0,
+        ))
+    return solucoes
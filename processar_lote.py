@@ -0,0 +1,198 @@
+"""
+Processamento em lote (sem interface) de arquivos de esquemas de redução.
+
+Entrada: CSV ou Parquet com uma linha por esquema, colunas `passe_1`, `passe_2`, …
+(reduções em %), opcionalmente `valor_inicial` e uma coluna de identificação.
+Esquemas com menos passes deixam as colunas finais vazias; um passe vazio
+entre passes preenchidos é rejeitado (erro com os esquemas afetados), assim
+como colunas de passe fora da sequência passe_1..passe_n.
+
+Saída: CSV, Parquet ou Arrow IPC (`.arrow`/`.feather`) com as colunas do
+`evolucao_reducao_bitola.csv` exportado pelo aplicativo, precedidas de
+"Esquema", escrita bloco a bloco em um arquivo temporário que só substitui o
+destino quando o lote termina sem erro. Parquet e Arrow são gravados direto dos
+arrays do resultado colunar, sem passar pelo pandas; nesses formatos "Passe" é
+inteiro (0 na linha "Inicial"). Com `--catalogo`, cada passe também é ajustado
+à fieira padronizada mais próxima (colunas "Fieira (mm)" e "Redução real (%)");
+com `--fio-redondo`, a grandeza convertida (área ↔ diâmetro) é acrescentada.
+
+Exemplo:
+    python processar_lote.py esquemas.parquet resultado.csv --grandeza area --processos 8
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from calculo_bitola import (
+    GRANDEZA_AREA,
+    GRANDEZA_DIAMETRO,
+    area_para_diametro,
+    calcular_lote,
+    matriz_de_passes,
+)
+from fieiras import CatalogoFieiras
+from resultado_colunar import ResultadoColunar
+
+
+def processar_bloco(bloco, grandeza, coluna_id=None, catalogo=None):
+    """Calcula um bloco de esquemas e devolve a tabela longa correspondente (`ResultadoColunar`)."""
+    if coluna_id and coluna_id in bloco:
+        ids = bloco[coluna_id].to_numpy()
+    else:
+        ids = bloco.index.to_numpy() + 1
+    # Passes vazios no fim do esquema não entram no cálculo nem na saída
+    red, num_passes = matriz_de_passes(bloco, ids)
+    v0 = bloco["valor_inicial"].to_numpy(dtype=np.float64) if "valor_inicial" in bloco else None
+
+    resultado = calcular_lote(red, v0)
+    extras = None
+    if catalogo is not None:
+        ajustados, reducoes_reais = catalogo.ajustar_resultado(resultado, grandeza)
+        if grandeza == GRANDEZA_AREA:
+            ajustados = area_para_diametro(ajustados)
+        extras = {"Fieira (mm)": ajustados, "Redução real (%)": reducoes_reais}
+    return ResultadoColunar.de_lote(resultado, grandeza, ids=ids, num_passes=num_passes, colunas_extras=extras)
+
+
+def ler_blocos(caminho, tamanho_bloco):
+    """Lê o arquivo de entrada em blocos de `tamanho_bloco` esquemas."""
+    if caminho.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        inicio = 0
+        for lote in pq.ParquetFile(caminho).iter_batches(batch_size=tamanho_bloco):
+            bloco = lote.to_pandas()
+            bloco.index = pd.RangeIndex(inicio, inicio + len(bloco))
+            inicio += len(bloco)
+            yield bloco
+    else:
+        yield from pd.read_csv(caminho, chunksize=tamanho_bloco)
+
+
+class _EscritorSaida:
+    """
+    Escreve a saída incrementalmente em CSV, Parquet ou Arrow IPC, em um
+    arquivo temporário ao lado do destino, renomeado só quando o lote termina.
+    """
+
+    def __init__(self, caminho, fio_redondo=False):
+        self.destino = caminho
+        self.caminho = f"{caminho}.{os.getpid()}.parcial"
+        self.fio_redondo = fio_redondo
+        extensao = caminho.lower().rsplit(".", 1)[-1]
+        self.formato = extensao if extensao in ("parquet", "arrow", "feather") else "csv"
+        self._escritor = None
+        self._destino = None
+        self._primeiro = True
+
+    def escrever(self, resultado):
+        if self.formato == "csv":
+            tabela = resultado.para_pandas(self.fio_redondo)
+            tabela.to_csv(self.caminho, mode="w" if self._primeiro else "a", header=self._primeiro, index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            tab = resultado.para_arrow(self.fio_redondo, dicionario=self.formato == "parquet")
+            if self._escritor is None:
+                if self.formato == "parquet":
+                    self._escritor = pq.ParquetWriter(self.caminho, tab.schema)
+                else:
+                    self._destino = pa.OSFile(self.caminho, "wb")
+                    self._escritor = pa.ipc.new_file(self._destino, tab.schema)
+            self._escritor.write_table(tab)
+        self._primeiro = False
+
+    def fechar(self, concluido=True):
+        """Fecha a saída; se `concluido`, publica no destino, senão descarta o arquivo parcial."""
+        try:
+            if self._escritor is not None:
+                self._escritor.close()
+            if self._destino is not None:
+                self._destino.close()
+        except BaseException:
+            concluido = False
+            raise
+        finally:
+            if os.path.exists(self.caminho):
+                if concluido:
+                    os.replace(self.caminho, self.destino)
+                else:
+                    os.remove(self.caminho)
+
+
+def processar_arquivo(entrada, saida, grandeza=GRANDEZA_DIAMETRO, tamanho_bloco=50_000,
+                      processos=None, coluna_id=None, catalogo=None, fio_redondo=False):
+    """
+    Processa `entrada` em blocos distribuídos entre `processos` trabalhadores,
+    mantendo no máximo dois blocos por trabalhador em memória. `catalogo` é um
+    `CatalogoFieiras` opcional; `fio_redondo` acrescenta a grandeza convertida.
+    Retorna o número de esquemas processados. Em caso de erro, `saida` não é
+    criada nem alterada.
+    """
+    processos = processos or os.cpu_count() or 1
+    escritor = _EscritorSaida(saida, fio_redondo)
+    total = 0
+    concluido = False
+    try:
+        if processos == 1:
+            for bloco in ler_blocos(entrada, tamanho_bloco):
+                escritor.escrever(processar_bloco(bloco, grandeza, coluna_id, catalogo))
+                total += len(bloco)
+            concluido = True
+            return total
+
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            pendentes = []  # mantém a ordem de entrada na saída
+            for bloco in ler_blocos(entrada, tamanho_bloco):
+                pendentes.append((len(bloco), executor.submit(processar_bloco, bloco, grandeza, coluna_id, catalogo)))
+                if len(pendentes) >= 2 * processos:
+                    n, futuro = pendentes.pop(0)
+                    escritor.escrever(futuro.result())
+                    total += n
+            for n, futuro in pendentes:
+                escritor.escrever(futuro.result())
+                total += n
+        concluido = True
+        return total
+    finally:
+        escritor.fechar(concluido)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cálculo em lote da redução de bitola.")
+    parser.add_argument("entrada", help="Arquivo CSV ou Parquet com os esquemas")
+    parser.add_argument("saida", help="Arquivo CSV, Parquet ou Arrow IPC (.arrow/.feather) de resultado")
+    parser.add_argument("--grandeza", choices=["diametro", "area"], default="diametro",
+                        help="Grandeza de valor_inicial (padrão: diametro)")
+    parser.add_argument("--tamanho-bloco", type=int, default=50_000,
+                        help="Esquemas por bloco (padrão: 50000)")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="Número de processos (padrão: núcleos disponíveis)")
+    parser.add_argument("--coluna-id", default="esquema",
+                        help="Coluna de identificação do esquema (padrão: esquema)")
+    parser.add_argument("--catalogo", default=None,
+                        help="CSV do catálogo de fieiras (colunas diametro e classe) para ajustar os passes")
+    parser.add_argument("--fio-redondo", action="store_true",
+                        help="Acrescenta a grandeza convertida para fio redondo (área ↔ diâmetro)")
+    args = parser.parse_args(argv)
+
+    grandeza = GRANDEZA_AREA if args.grandeza == "area" else GRANDEZA_DIAMETRO
+    catalogo = CatalogoFieiras.de_csv(args.catalogo) if args.catalogo else None
+    try:
+        total = processar_arquivo(args.entrada, args.saida, grandeza, args.tamanho_bloco,
+                                  args.processos, args.coluna_id, catalogo, args.fio_redondo)
+    except ValueError as erro:
+        print(f"Erro: {erro}", file=sys.stderr)
+        return 1
+    print(f"{total} esquemas processados -> {args.saida}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+Projeto inverso: reduções por passe a partir do valor inicial, do alvo e do número de passes.
+
+Como Vₙ = V₀ · ∏(1 - rᵢ), reduções iguais saem em forma fechada:
+
+    r = 1 - (V_alvo / V₀)^(1/N)
+
+Nos esquemas afunilados as reduções decrescem em progressão geométrica,
+rₖ = r₁ · q^(k-1) com 0 < q ≤ 1, e r₁ é obtido por bisseção (vetorizada) de
+Σ ln(1 - r₁·q^(k-1)) = ln(V_alvo / V₀); q = 1 recai nas reduções iguais.
+
+Uma grade densa de r₁ sobre combinações usuais de valor inicial, alvo, número
+de passes e afunilamento pode ser pré-calculada em um arquivo .npy mapeado em
+memória (eixos em um .json ao lado), de modo que consultas e a tabela completa
+de projeto saem sem recálculo:
+
+    python projeto_inverso.py            # caminho padrão (ou REDUCAO_BITOLA_GRADE)
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+CAMINHO_GRADE_PADRAO = os.environ.get(
+    "REDUCAO_BITOLA_GRADE",
+    os.path.join(os.path.expanduser("~"), ".cache", "reducao_bitola", "grade_projeto.npy"),
+)
+
+# Eixos padrão da grade: fio-máquina e bitolas usuais (mm), passes e afunilamentos
+INICIAIS_PADRAO = (5.5, 6.0, 6.5, 7.0, 8.0, 9.0, 10.0, 11.0, 12.0, 12.5, 14.0, 16.0)
+ALVOS_PADRAO = tuple(np.round(np.arange(0.50, 12.0001, 0.05), 2))
+PASSES_PADRAO = tuple(range(1, 26))
+AFUNILAMENTOS_PADRAO = (0.80, 0.85, 0.90, 0.92, 0.94, 0.96, 0.98, 1.0)
+ITERACOES_BISSECAO = 64
+
+
+def reducoes_iguais(valor_inicial, valor_alvo, num_passes):
+    """Redução (%) igual em todos os passes que leva V₀ a V_alvo em N passes (arrays ou escalares)."""
+    razao = np.asarray(valor_alvo, dtype=np.float64) / np.asarray(valor_inicial, dtype=np.float64)
+    return 0.0 - np.expm1(np.log(razao) / np.asarray(num_passes, dtype=np.float64)) * 100.0
+
+
+def _checar(valor_inicial, valor_alvo, afunilamento):
+    if np.any(np.asarray(valor_inicial) <= 0) or np.any(np.asarray(valor_alvo) <= 0):
+        raise ValueError("Valor inicial e alvo devem ser positivos.")
+    if np.any(np.asarray(valor_alvo) >= np.asarray(valor_inicial)):
+        raise ValueError("O valor alvo deve ser menor que o valor inicial.")
+    q = np.asarray(afunilamento, dtype=np.float64)
+    if np.any((q <= 0.0) | (q > 1.0)):
+        raise ValueError("O afunilamento deve estar entre 0 (exclusive) e 1.")
+
+
+def primeira_reducao(valor_inicial, valor_alvo, num_passes, afunilamento=1.0):
+    """
+    r₁ (%) do esquema geométrico rₖ = r₁·q^(k-1) que atinge o alvo em N passes.
+
+    Os argumentos são combinados por broadcasting; a bisseção avança todas as
+    combinações ao mesmo tempo, com um eixo extra para os passes.
+    """
+    _checar(valor_inicial, valor_alvo, afunilamento)
+    log_alvo, passes, q = np.broadcast_arrays(
+        np.log(np.asarray(valor_alvo, dtype=np.float64) / np.asarray(valor_inicial, dtype=np.float64)),
+        np.asarray(num_passes, dtype=np.int64),
+        np.asarray(afunilamento, dtype=np.float64),
+    )
+    k = np.arange(int(passes.max()))
+    # pesos q^(k-1) só nos passes existentes de cada combinação
+    pesos = np.where(k < passes[..., np.newaxis], q[..., np.newaxis] ** k, 0.0)
+
+    baixo = np.zeros(log_alvo.shape)
+    alto = np.ones(log_alvo.shape)
+    with np.errstate(divide="ignore"):
+        for _ in range(ITERACOES_BISSECAO):
+            meio = 0.5 * (baixo + alto)
+            soma = np.log1p(-meio[..., np.newaxis] * pesos).sum(axis=-1)
+            passou = soma < log_alvo  # redução demais: r₁ menor
+            alto = np.where(passou, meio, alto)
+            baixo = np.where(passou, baixo, meio)
+    return 0.5 * (baixo + alto) * 100.0
+
+
+def esquema_afunilado(primeira_reducao_pct, num_passes, afunilamento=1.0):
+    """Reduções (%) r₁·q^(k-1), k = 1..N."""
+    return primeira_reducao_pct * afunilamento ** np.arange(num_passes)
+
+
+def projetar(valor_inicial, valor_alvo, num_passes, afunilamento=1.0):
+    """Reduções (%) por passe do esquema (igual se q = 1, afunilado se q < 1)."""
+    if afunilamento == 1.0:
+        _checar(valor_inicial, valor_alvo, afunilamento)
+        return np.full(num_passes, float(reducoes_iguais(valor_inicial, valor_alvo, num_passes)))
+    r1 = float(primeira_reducao(valor_inicial, valor_alvo, num_passes, afunilamento))
+    return esquema_afunilado(r1, num_passes, afunilamento)
+
+
+def _eixos_json(caminho):
+    return os.path.splitext(caminho)[0] + ".json"
+
+
+def gerar_grade(caminho, iniciais=INICIAIS_PADRAO, alvos=ALVOS_PADRAO, passes=PASSES_PADRAO,
+                afunilamentos=AFUNILAMENTOS_PADRAO):
+    """
+    Grava a grade de r₁ (%) com forma (iniciais, alvos, passes, afunilamentos) em
+    um .npy mapeado em memória, um valor inicial por vez; combinações sem
+    solução (alvo ≥ inicial) ficam NaN. Os eixos vão para o .json ao lado.
+    """
+    # eixos ordenados e sem repetição, para a consulta por busca binária
+    iniciais = np.unique(np.asarray(iniciais, dtype=np.float64))
+    alvos = np.unique(np.asarray(alvos, dtype=np.float64))
+    passes = np.unique(np.asarray(passes, dtype=np.int64))
+    afunilamentos = np.unique(np.asarray(afunilamentos, dtype=np.float64))
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    grade = np.lib.format.open_memmap(
+        caminho, mode="w+", dtype=np.float64,
+        shape=(iniciais.size, alvos.size, passes.size, afunilamentos.size),
+    )
+    for i, v0 in enumerate(iniciais):
+        grade[i] = np.nan
+        validos = alvos < v0
+        if validos.any():
+            grade[i, validos] = primeira_reducao(
+                v0, alvos[validos, np.newaxis, np.newaxis], passes[:, np.newaxis], afunilamentos,
+            )
+    grade.flush()
+    del grade
+    with open(_eixos_json(caminho), "w", encoding="utf-8") as f:
+        json.dump({"iniciais": iniciais.tolist(), "alvos": alvos.tolist(), "passes": passes.tolist(),
+                   "afunilamentos": afunilamentos.tolist()}, f)
+
+
+def _posicao(eixo, valor):
+    """Índice de `valor` no eixo ordenado (comparação com tolerância) ou None."""
+    i = int(np.searchsorted(eixo, valor))
+    for j in (i - 1, i):
+        if 0 <= j < eixo.size and np.isclose(eixo[j], valor, rtol=0.0, atol=1e-9):
+            return j
+    return None
+
+
+class GradeProjeto:
+    """Grade pré-calculada de r₁, aberta somente para leitura (mapeada em memória)."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.grade = np.load(caminho, mmap_mode="r")
+        with open(_eixos_json(caminho), encoding="utf-8") as f:
+            eixos = json.load(f)
+        self.iniciais = np.asarray(eixos["iniciais"])
+        self.alvos = np.asarray(eixos["alvos"])
+        self.passes = np.asarray(eixos["passes"])
+        self.afunilamentos = np.asarray(eixos["afunilamentos"])
+        if self.grade.shape != (self.iniciais.size, self.alvos.size, self.passes.size, self.afunilamentos.size):
+            raise ValueError("Grade de projeto e eixos não correspondem.")
+
+    @classmethod
+    def abrir_ou_gerar(cls, caminho, **eixos):
+        if not (os.path.exists(caminho) and os.path.exists(_eixos_json(caminho))):
+            gerar_grade(caminho, **eixos)
+        return cls(caminho)
+
+    def contem(self, valor_inicial, valor_alvo):
+        """True se o par (inicial, alvo) está na grade."""
+        return _posicao(self.iniciais, valor_inicial) is not None and _posicao(self.alvos, valor_alvo) is not None
+
+    def consultar(self, valor_inicial, valor_alvo, num_passes, afunilamento=1.0):
+        """Reduções (%) por passe a partir da grade; None se a combinação não estiver nela."""
+        indices = (_posicao(self.iniciais, valor_inicial), _posicao(self.alvos, valor_alvo),
+                   _posicao(self.passes, num_passes), _posicao(self.afunilamentos, afunilamento))
+        if None in indices:
+            return None
+        r1 = float(self.grade[indices])
+        return None if np.isnan(r1) else esquema_afunilado(r1, num_passes, afunilamento)
+
+    def primeiras_reducoes(self, valor_inicial, valor_alvo):
+        """Fatia (passes, afunilamentos) de r₁ (%) do par, ou None fora da grade."""
+        i, j = _posicao(self.iniciais, valor_inicial), _posicao(self.alvos, valor_alvo)
+        if i is None or j is None:
+            return None
+        return np.asarray(self.grade[i, j])
+
+
+def tabela_projeto(valor_inicial, valor_alvo, passes=PASSES_PADRAO, afunilamentos=AFUNILAMENTOS_PADRAO,
+                   primeiras=None):
+    """
+    Tabela (pandas) de todos os esquemas do par (inicial, alvo): uma linha por
+    número de passes e afunilamento. `primeiras` (passes × afunilamentos, r₁ %)
+    vem da grade quando disponível; caso contrário é calculada.
+    """
+    import pandas as pd
+
+    passes = np.asarray(passes, dtype=np.int64)
+    afunilamentos = np.asarray(afunilamentos, dtype=np.float64)
+    if primeiras is None:
+        primeiras = primeira_reducao(valor_inicial, valor_alvo, passes[:, np.newaxis], afunilamentos)
+    n, q = np.meshgrid(passes, afunilamentos, indexing="ij")
+    r1 = np.asarray(primeiras, dtype=np.float64)
+    ultima = r1 * q ** (n - 1)
+    return pd.DataFrame({
+        "Passes": n.ravel(),
+        "Afunilamento (q)": q.ravel(),
+        "Primeira redução (%)": r1.ravel(),
+        "Última redução (%)": ultima.ravel(),
+        "Reduções (%)": [" / ".join(f"{r:.3f}" for r in esquema_afunilado(a, b, c))
+                         for a, b, c in zip(r1.ravel(), n.ravel(), q.ravel())],
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera a grade pré-calculada de projeto inverso (.npy + .json).")
+    parser.add_argument("caminho", nargs="?", default=CAMINHO_GRADE_PADRAO, help="Arquivo .npy de saída")
+    args = parser.parse_args(argv)
+    gerar_grade(args.caminho)
+    grade = GradeProjeto(args.caminho)
+    print(f"Grade {grade.grade.shape} gravada em {args.caminho} ({grade.grade.nbytes / 1e6:.1f} MB).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
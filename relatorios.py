@@ -0,0 +1,324 @@
+"""
+Folhas de processo em Excel e PDF, geradas em segundo plano.
+
+Cada relatório cobre um ou muitos esquemas (nome, reduções em %, valor
+inicial) e traz, por esquema, a tabela por passe, a conversão para fio
+redondo, um gráfico e as notas de cálculo; o Excel abre com uma aba de resumo.
+
+`GeradorRelatorios` executa os pedidos em um pool de processos, informa o
+andamento (esquemas concluídos) e guarda os arquivos prontos em um cache
+SQLite (`cache_persistente`) pela chave das entradas: pedir de novo o mesmo
+relatório não gera nada. Se o arquivo do cache não puder ser aberto, os
+relatórios ficam só em memória, como em `cache_persistente.cache_global`.
+"""
+
+import hashlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from cache_persistente import CAMINHO_PADRAO, CachePersistente
+from calculo_bitola import (
+    COL_FATOR,
+    COL_RED_ACUM,
+    COL_RED_ENTRE,
+    GRANDEZA_AREA,
+    GRANDEZA_DIAMETRO,
+    calcular_esquema,
+    converter_fio_redondo,
+    tabela_evolucao,
+)
+
+FORMATOS = {"xlsx": "Excel", "pdf": "PDF"}
+TIPOS_MIME = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+CAMINHO_CACHE_RELATORIOS = os.path.join(os.path.dirname(CAMINHO_PADRAO), "relatorios.sqlite")
+TAMANHO_CACHE_RELATORIOS = 512 * 1024 * 1024
+LINHAS_TABELA_PDF = 30  # passes por página na tabela do PDF
+
+NOTAS = (
+    "Redução entre passes (%): valor informado por passe.",
+    "Redução acumulada (%) = (1 - ∏(1 - rᵢ)) × 100; Vₖ = V₀ × ∏(1 - rᵢ).",
+    "Fio redondo: área = π·d²/4 e d = √(4·área/π).",
+)
+
+# Estados de um pedido
+GERANDO = "gerando"
+PRONTO = "pronto"
+ERRO = "erro"
+DESCONHECIDO = "desconhecido"
+
+
+def chave_relatorio(formato, esquemas, grandeza):
+    """Hash estável do pedido: formato, grandeza e esquemas normalizados."""
+    dados = [formato, str(grandeza), [_normalizar(e) for e in esquemas]]
+    return hashlib.sha256(json.dumps(dados, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def _normalizar(esquema):
+    nome, reducoes, valor_inicial = esquema
+    valor = float(valor_inicial) if valor_inicial and valor_inicial > 0 else 0.0
+    return [str(nome), [repr(float(r)) for r in reducoes], repr(valor)]
+
+
+def _tem_valor(resultado):
+    return not math.isnan(resultado.valores_iniciais[0])
+
+
+def _tabelas(esquema, grandeza):
+    """Tabela por passe (com a conversão para fio redondo, se houver valor inicial) e o resultado."""
+    nome, reducoes, valor_inicial = esquema
+    resultado = calcular_esquema(reducoes, valor_inicial or None)
+    df = tabela_evolucao(resultado, grandeza)
+    valor_col = GRANDEZA_AREA if grandeza == GRANDEZA_AREA else GRANDEZA_DIAMETRO
+    if _tem_valor(resultado):
+        col_convertida, convertidos = converter_fio_redondo(df[valor_col].to_numpy(dtype=float), grandeza)
+        df[col_convertida] = convertidos
+    return df, resultado
+
+
+def gerar_excel(esquemas, grandeza, ao_avancar=None):
+    """Pasta de trabalho (bytes .xlsx): aba de resumo e uma aba formatada, com gráfico, por esquema."""
+    from openpyxl import Workbook
+    from openpyxl.chart import LineChart, Reference
+    from openpyxl.styles import Alignment, Font, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    livro = Workbook()
+    resumo = livro.active
+    resumo.title = "Resumo"
+    resumo.append(["Esquema", "Passes", "Redução total (%)", f"Inicial — {grandeza}", f"Final — {grandeza}"])
+    negrito, fundo = Font(bold=True), PatternFill("solid", fgColor="DDEBF7")
+    nomes_usados = {"Resumo"}
+
+    for i, esquema in enumerate(esquemas):
+        df, resultado = _tabelas(esquema, grandeza)
+        nome = str(esquema[0])
+        valor_final = resultado.valores_finais[0]
+        resumo.append([nome, resultado.num_passes, float(resultado.reducao_total_pct[0]),
+                       esquema[2] or None, None if math.isnan(valor_final) else float(valor_final)])
+
+        # Nome de aba: até 31 caracteres, sem caracteres proibidos e sem repetição
+        base = "".join(c for c in nome if c not in '[]:*?/\\')[:28] or f"Esquema {i + 1}"
+        titulo, n = base, 1
+        while titulo in nomes_usados:
+            n += 1
+            titulo = f"{base[:27 - len(str(n))]} ({n})"
+        nomes_usados.add(titulo)
+        aba = livro.create_sheet(titulo)
+        aba.append(list(df.columns))
+        for linha in df.itertuples(index=False):
+            aba.append([None if isinstance(v, float) and math.isnan(v) else v for v in linha])
+        for celula in aba[1]:
+            celula.font, celula.fill = negrito, fundo
+            celula.alignment = Alignment(wrap_text=True, vertical="center")
+        for col in range(2, len(df.columns) + 1):
+            aba.column_dimensions[get_column_letter(col)].width = 18
+            for (celula,) in aba.iter_rows(min_row=2, min_col=col, max_col=col):
+                celula.number_format = "0.000" if "%" in str(df.columns[col - 1]) else "0.000000"
+        aba.freeze_panes = "A2"
+
+        linha_notas = len(df) + 3
+        aba.cell(row=linha_notas, column=1, value="Notas").font = negrito
+        for k, nota in enumerate(NOTAS, start=1):
+            aba.cell(row=linha_notas + k, column=1, value=nota)
+
+        # Gráfico da grandeza (ou da redução acumulada, sem valor inicial) por passe
+        coluna_grafico = df.columns.get_loc(grandeza if _tem_valor(resultado) else COL_RED_ACUM) + 1
+        grafico = LineChart()
+        grafico.title = f"{nome} — {df.columns[coluna_grafico - 1]}"
+        grafico.x_axis.title = "Passe"
+        grafico.height, grafico.width = 7.5, 16
+        grafico.add_data(Reference(aba, min_col=coluna_grafico, min_row=1, max_row=len(df) + 1),
+                         titles_from_data=True)
+        grafico.set_categories(Reference(aba, min_col=1, min_row=2, max_row=len(df) + 1))
+        aba.add_chart(grafico, f"{get_column_letter(len(df.columns) + 2)}2")
+        if ao_avancar is not None:
+            ao_avancar(i + 1)
+
+    for celula in resumo[1]:
+        celula.font, celula.fill = negrito, fundo
+    for col, largura in zip("ABCDE", (24, 10, 18, 20, 20)):
+        resumo.column_dimensions[col].width = largura
+    for linha in resumo.iter_rows(min_row=2, min_col=3, max_col=5):
+        for celula in linha:
+            celula.number_format = "0.000000"
+    resumo.freeze_panes = "A2"
+
+    saida = io.BytesIO()
+    livro.save(saida)
+    return saida.getvalue()
+
+
+def _formatar(valor, coluna):
+    if isinstance(valor, str):
+        return valor
+    if valor is None or (isinstance(valor, float) and math.isnan(valor)):
+        return ""
+    if coluna == "Passe":
+        return str(valor)
+    return f"{valor:.3f}" if "%" in coluna else f"{valor:.6f}"
+
+
+def gerar_pdf(esquemas, grandeza, ao_avancar=None):
+    """Folhas de processo (bytes .pdf): por esquema, gráfico, tabela por passe e notas (A4)."""
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
+
+    saida = io.BytesIO()
+    with PdfPages(saida) as pdf:
+        for i, esquema in enumerate(esquemas):
+            df, resultado = _tabelas(esquema, grandeza)
+            nome = str(esquema[0])
+            colunas = [c for c in df.columns if c != COL_FATOR]
+            partes = [df.iloc[k:k + LINHAS_TABELA_PDF] for k in range(0, len(df), LINHAS_TABELA_PDF)] or [df]
+
+            for pagina, parte in enumerate(partes):
+                fig = Figure(figsize=(8.27, 11.69))
+                titulo = f"Folha de processo — {nome}"
+                if len(partes) > 1:
+                    titulo += f" ({pagina + 1}/{len(partes)})"
+                fig.suptitle(titulo, fontsize=13, fontweight="bold")
+                if pagina == 0:
+                    fig.text(0.08, 0.93, f"{resultado.num_passes} passes · redução total "
+                             f"{resultado.reducao_total_pct[0]:.3f}%", fontsize=10)
+                    ax = fig.add_axes((0.1, 0.62, 0.8, 0.28))
+                    passes = list(range(1, resultado.num_passes + 1))
+                    ax.bar(passes, resultado.reducoes_pct[0], color="#9DC3E6", label=COL_RED_ENTRE)
+                    ax.set_xlabel("Passe")
+                    ax.set_ylabel("%")
+                    eixo = ax.twinx()
+                    if _tem_valor(resultado):
+                        eixo.plot([0] + passes, df[grandeza].to_numpy(dtype=float), color="#C00000", marker="o",
+                                  label=grandeza)
+                        eixo.set_ylabel(grandeza)
+                    else:
+                        eixo.plot(passes, resultado.reducao_acum_pct[0], color="#C00000", marker="o",
+                                  label=COL_RED_ACUM)
+                        eixo.set_ylabel(COL_RED_ACUM)
+                    ax.legend(loc="upper left", fontsize=8)
+                    eixo.legend(loc="upper right", fontsize=8)
+                    topo_tabela = 0.56
+                else:
+                    topo_tabela = 0.92
+
+                ax_tabela = fig.add_axes((0.05, topo_tabela - 0.017 * (len(parte) + 1) - 0.01, 0.9,
+                                          0.017 * (len(parte) + 1)))
+                ax_tabela.axis("off")
+                tabela = ax_tabela.table(
+                    cellText=[[_formatar(v, c) for v, c in zip(linha, colunas)]
+                              for linha in parte[colunas].itertuples(index=False)],
+                    colLabels=colunas, loc="upper center", cellLoc="center",
+                )
+                tabela.auto_set_font_size(False)
+                tabela.set_fontsize(7)
+                if pagina == len(partes) - 1:
+                    fig.text(0.08, 0.08, "Notas:\n" + "\n".join(f"• {n}" for n in NOTAS), fontsize=8, va="top")
+                pdf.savefig(fig)
+            if ao_avancar is not None:
+                ao_avancar(i + 1)
+    return saida.getvalue()
+
+
+_GERADORES = {"xlsx": gerar_excel, "pdf": gerar_pdf}
+
+
+def _gerar_no_trabalhador(formato, esquemas, grandeza, progresso, chave):
+    def ao_avancar(feitos):
+        progresso[chave] = feitos
+
+    return _GERADORES[formato](esquemas, grandeza, ao_avancar)
+
+
+@dataclass(frozen=True)
+class Andamento:
+    """Situação de um pedido de relatório."""
+
+    estado: str
+    feitos: int = 0
+    total: int = 0
+    erro: str = ""
+
+
+class GeradorRelatorios:
+    """Pool de processos que gera relatórios sob demanda, com andamento e cache por pedido."""
+
+    def __init__(self, processos=2, cache=None):
+        self.processos = processos
+        if cache is None:
+            try:
+                cache = CachePersistente(CAMINHO_CACHE_RELATORIOS, tamanho_maximo=TAMANHO_CACHE_RELATORIOS,
+                                         entradas_memoria=8)
+            except (OSError, sqlite3.Error):
+                cache = CachePersistente(":memory:", tamanho_maximo=TAMANHO_CACHE_RELATORIOS, entradas_memoria=8)
+        self.cache = cache
+        self._trava = threading.Lock()
+        self._executor = None
+        self._progresso = None
+        self._pedidos = {}  # chave -> (futuro, total)
+
+    def _iniciar(self):
+        # "spawn": processos novos, sem herdar as threads do servidor
+        contexto = multiprocessing.get_context("spawn")
+        self._gerente = contexto.Manager()
+        self._progresso = self._gerente.dict()
+        self._executor = ProcessPoolExecutor(max_workers=self.processos, mp_context=contexto)
+
+    def solicitar(self, formato, esquemas, grandeza):
+        """Agenda o relatório (se ainda não existir) e devolve a chave para acompanhar o pedido."""
+        if formato not in _GERADORES:
+            raise ValueError(f"Formato desconhecido: {formato}")
+        esquemas = [(str(n), tuple(float(r) for r in red), float(v or 0.0)) for n, red, v in esquemas]
+        chave = chave_relatorio(formato, esquemas, grandeza)
+        with self._trava:
+            pedido = self._pedidos.get(chave)
+            if (pedido is not None and not pedido[0].done()) or self.cache.contem(chave):
+                return chave
+            if self._executor is None:
+                self._iniciar()
+            self._progresso[chave] = 0
+            futuro = self._executor.submit(_gerar_no_trabalhador, formato, esquemas, grandeza, self._progresso, chave)
+            self._pedidos[chave] = (futuro, len(esquemas))
+        futuro.add_done_callback(lambda f: self._concluir(chave, f))
+        return chave
+
+    def _concluir(self, chave, futuro):
+        if futuro.cancelled() or futuro.exception() is not None:
+            return  # o erro fica no pedido, para `estado`
+        self.cache.gravar(chave, futuro.result())
+        with self._trava:
+            self._pedidos.pop(chave, None)
+            self._progresso.pop(chave, None)
+
+    def estado(self, chave):
+        with self._trava:
+            pedido = self._pedidos.get(chave)
+            if pedido is not None:
+                futuro, total = pedido
+                if futuro.cancelled():  # p.ex. pendente quando o gerador foi encerrado
+                    return Andamento(ERRO, total=total, erro="Geração cancelada.")
+                if futuro.done() and futuro.exception() is not None:
+                    return Andamento(ERRO, total=total, erro=str(futuro.exception()))
+                if not futuro.done():
+                    return Andamento(GERANDO, feitos=self._progresso.get(chave, 0), total=total)
+        if self.cache.contem(chave):
+            return Andamento(PRONTO)
+        # concluído, mas ainda sendo gravado no cache
+        return Andamento(GERANDO, total=pedido[1]) if pedido is not None else Andamento(DESCONHECIDO)
+
+    def resultado(self, chave):
+        """Bytes do relatório pronto, ou None."""
+        return self.cache.obter(chave)
+
+    def encerrar(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._gerente.shutdown()
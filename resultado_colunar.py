@@ -0,0 +1,181 @@
+"""
+Resultado de um lote em formato colunar, para exportação de grandes volumes.
+
+Uma linha por passe de cada esquema (mais a linha "Inicial" quando há valor
+inicial), guardada em arrays NumPy contíguos: float64 para as grandezas,
+inteiros para esquema e passe, e uma máscara de validade para o valor (falso
+quando o esquema não tem valor inicial). Diâmetro e área não são guardados
+duas vezes: a grandeza que não foi calculada é derivada sob demanda.
+
+Na exportação para Arrow (IPC ou Parquet) os buffers dos arrays float64 são
+entregues ao pyarrow sem cópia; só a máscara vira um bitmap de validade
+(1 bit por linha). O pyarrow e o pandas são importados apenas quando usados.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from calculo_bitola import (
+    COL_FATOR,
+    COL_PASSE,
+    COL_RED_ACUM,
+    COL_RED_ENTRE,
+    GRANDEZA_AREA,
+    GRANDEZA_DIAMETRO,
+    converter_fio_redondo,
+)
+
+COL_ESQUEMA = "Esquema"
+PASSE_INICIAL = 0  # número do passe na linha "Inicial"
+
+
+@dataclass(frozen=True)
+class ResultadoColunar:
+    """Tabela longa de um lote: arrays (L,) alinhados, uma posição por linha."""
+
+    grandeza: str
+    esquemas: np.ndarray             # (m,) identificação de cada esquema
+    indice_esquema: np.ndarray       # (L,) int32, posição em `esquemas`
+    passe: np.ndarray                # (L,) int32, 0 na linha "Inicial"
+    reducao_entre_pct: np.ndarray    # (L,) float64, NaN na linha "Inicial"
+    reducao_acum_pct: np.ndarray     # (L,) float64
+    fator_restante: np.ndarray       # (L,) float64
+    valor: np.ndarray                # (L,) float64, grandeza principal
+    valido: np.ndarray               # (L,) bool, há valor inicial
+    extras: dict = field(default_factory=dict)  # {nome: (L,) float64}, NaN na linha "Inicial"
+
+    @classmethod
+    def de_lote(cls, resultado, grandeza, ids=None, num_passes=None, colunas_extras=None):
+        """
+        Achata um `ResultadoLote` (m, n) nas linhas da tabela longa.
+
+        `num_passes` (m,) permite esquemas com menos passes que a largura da
+        matriz; `colunas_extras` ({nome: array (m, n)}) acrescenta colunas por passe.
+        """
+        grandeza = GRANDEZA_AREA if grandeza == GRANDEZA_AREA else GRANDEZA_DIAMETRO
+        m, n = resultado.num_esquemas, resultado.num_passes
+        ids = np.arange(1, m + 1) if ids is None else np.asarray(ids)
+        if num_passes is None:
+            num_passes = np.full(m, n)
+
+        # Grade (m, n + 1): coluna 0 é a linha "Inicial"
+        tem_valor = ~np.isnan(resultado.valores_iniciais)
+        mascara = np.arange(1, n + 1)[np.newaxis, :] <= np.asarray(num_passes)[:, np.newaxis]
+        mascara = np.concatenate((tem_valor[:, np.newaxis], mascara), axis=1)
+
+        def achatar(inicial, por_passe):
+            return np.concatenate((inicial, por_passe), axis=1)[mascara]
+
+        coluna = np.ones((m, 1))
+        indice = np.broadcast_to(np.arange(m, dtype=np.int32)[:, np.newaxis], (m, n + 1))[mascara]
+        passe = np.broadcast_to(np.arange(n + 1, dtype=np.int32), (m, n + 1))[mascara]
+        extras = {
+            nome: achatar(np.nan * coluna, np.asarray(extra, dtype=np.float64))
+            for nome, extra in (colunas_extras or {}).items()
+        }
+        return cls(
+            grandeza=grandeza,
+            esquemas=ids,
+            indice_esquema=indice,
+            passe=passe,
+            reducao_entre_pct=achatar(np.nan * coluna, resultado.reducoes_pct),
+            reducao_acum_pct=achatar(0.0 * coluna, resultado.reducao_acum_pct),
+            fator_restante=achatar(coluna, resultado.fator_restante),
+            valor=achatar(resultado.valores_iniciais[:, np.newaxis], resultado.valores),
+            valido=np.broadcast_to(tem_valor[:, np.newaxis], (m, n + 1))[mascara],
+            extras=extras,
+        )
+
+    @property
+    def num_linhas(self):
+        return self.passe.size
+
+    @property
+    def diametro(self):
+        """Diâmetro (mm) de cada linha; derivado da área quando essa é a grandeza principal."""
+        if self.grandeza == GRANDEZA_DIAMETRO:
+            return self.valor
+        return converter_fio_redondo(self.valor, self.grandeza)[1]
+
+    @property
+    def area(self):
+        """Área (mm²) de cada linha; derivada do diâmetro quando esse é a grandeza principal."""
+        if self.grandeza == GRANDEZA_AREA:
+            return self.valor
+        return converter_fio_redondo(self.valor, self.grandeza)[1]
+
+    def _colunas_float(self, fio_redondo):
+        colunas = {
+            COL_RED_ENTRE: (self.reducao_entre_pct, None),
+            COL_RED_ACUM: (self.reducao_acum_pct, None),
+            COL_FATOR: (self.fator_restante, None),
+            self.grandeza: (self.valor, self.valido),
+        }
+        if fio_redondo:
+            convertida = GRANDEZA_AREA if self.grandeza == GRANDEZA_DIAMETRO else GRANDEZA_DIAMETRO
+            colunas[convertida] = (self.area if convertida == GRANDEZA_AREA else self.diametro, self.valido)
+        for nome, extra in self.extras.items():
+            colunas[nome] = (extra, None)
+        return colunas
+
+    def para_arrow(self, fio_redondo=False, dicionario=True):
+        """
+        Tabela pyarrow com as colunas do CSV do aplicativo. "Esquema" é um
+        dicionário (índices int32 + ids), "Passe" é inteiro (0 = "Inicial") e
+        NaN ou valor ausente vira nulo. `fio_redondo` inclui a grandeza convertida.
+        Com `dicionario=False` os ids são gravados por extenso (um arquivo IPC
+        gravado em vários blocos não aceita um dicionário diferente por bloco).
+        """
+        import pyarrow as pa
+
+        indices = _array_arrow(self.indice_esquema, pa.int32())
+        if dicionario:
+            esquema = pa.DictionaryArray.from_arrays(indices, pa.array(self.esquemas))
+        else:
+            esquema = pa.array(self.esquemas).take(indices)
+        colunas = {COL_ESQUEMA: esquema, COL_PASSE: _array_arrow(self.passe, pa.int32())}
+        for nome, (dados, valido) in self._colunas_float(fio_redondo).items():
+            colunas[nome] = _array_arrow(dados, pa.float64(), valido)
+        return pa.table(colunas)
+
+    def para_pandas(self, fio_redondo=False):
+        """DataFrame nas colunas e no formato do CSV do aplicativo (linha "Inicial" em "Passe")."""
+        import pandas as pd
+
+        passes = self.passe.astype(object)
+        passes[self.passe == PASSE_INICIAL] = "Inicial"
+        colunas = {COL_ESQUEMA: self.esquemas[self.indice_esquema], COL_PASSE: passes}
+        for nome, (dados, _) in self._colunas_float(fio_redondo).items():
+            colunas[nome] = dados  # sem valor inicial, o valor já é NaN
+        return pd.DataFrame(colunas)
+
+    def escrever_arrow(self, caminho, fio_redondo=False):
+        """Grava em Arrow IPC (arquivo `.arrow`/`.feather`, legível por memory map)."""
+        import pyarrow as pa
+
+        tabela = self.para_arrow(fio_redondo)
+        with pa.OSFile(caminho, "wb") as destino, pa.ipc.new_file(destino, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+
+    def escrever_parquet(self, caminho, fio_redondo=False):
+        import pyarrow.parquet as pq
+
+        pq.write_table(self.para_arrow(fio_redondo), caminho)
+
+
+def _array_arrow(dados, tipo, valido=None):
+    """
+    Array pyarrow sobre o buffer do array NumPy, sem cópia. A validade vem de
+    `valido` ou, em float, de NaN; só o bitmap (1 bit por linha) é alocado.
+    """
+    import pyarrow as pa
+
+    dados = np.ascontiguousarray(dados, dtype=tipo.to_pandas_dtype())
+    if valido is None and pa.types.is_floating(tipo):
+        valido = ~np.isnan(dados)
+    if valido is None or valido.all():
+        return pa.Array.from_buffers(tipo, dados.size, [None, pa.py_buffer(dados)])
+    bitmap = pa.py_buffer(np.packbits(valido, bitorder="little"))
+    nulos = int(dados.size - np.count_nonzero(valido))
+    return pa.Array.from_buffers(tipo, dados.size, [bitmap, pa.py_buffer(dados)], null_count=nulos)
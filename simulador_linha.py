@@ -0,0 +1,295 @@
+"""
+Simulação por eventos discretos da produção de trefiladoras multipasses.
+
+Pela constância de volume, a velocidade do fio após cada fieira é
+vₖ = v_final · A_final / Aₖ: as áreas por passe do esquema definem a velocidade
+de cada cabrestante. A velocidade final da máquina é a maior que respeita o
+limite de rotação (m/s) e, opcionalmente, de potência (kW, via `esforcos`) de
+todos os cabrestantes; o que limita é o gargalo.
+
+Na simulação, bobinas de fio-máquina atravessam a máquina em regime e a linha
+para para troca de bobina, troca de fieira (ao fim da vida em km de fio de
+cada fieira) e falhas aleatórias (MTBF/MTTR exponenciais). Trocas de fieira e
+reparos podem disputar um número limitado de equipes de manutenção
+compartilhadas entre as linhas. Cada trecho de produção contínua é um único
+evento, de modo que um mês de várias linhas é simulado em frações de segundo.
+"""
+
+import heapq
+import itertools
+import math
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+from calculo_bitola import GRANDEZA_AREA, calcular_esquema, diametro_para_area
+
+DENSIDADE_ACO = 7850.0  # kg/m³
+HORAS_MES = 30 * 24.0
+
+# Motivos de parada
+BOBINA = "bobina"
+FIEIRA = "fieira"
+FALHA = "falha"
+
+# Tipos de evento
+_INICIO = 0
+_FIM_TRECHO = 1
+_FIM_MANUTENCAO = 2
+
+
+@dataclass(frozen=True)
+class Linha:
+    """Trefiladora: esquema de passes, limites dos cabrestantes, bobinas e paradas."""
+
+    nome: str
+    reducoes_pct: tuple
+    valor_inicial: float                 # diâmetro (mm) ou área (mm²) do fio-máquina
+    grandeza: str
+    velocidade_max: float = 20.0         # m/s, limite de rotação de cada cabrestante
+    potencia_max_kW: float = 0.0         # por cabrestante; 0 = sem limite
+    material: object = None              # esforcos.Material (exigido com limite de potência)
+    angulo_graus: float = 6.0
+    atrito: float = 0.05
+    densidade: float = DENSIDADE_ACO     # kg/m³
+    massa_bobina_kg: float = 2000.0
+    troca_bobina_min: float = 5.0
+    vida_fieira_km: float = 500.0        # km de fio que passam por uma fieira até a troca
+    troca_fieira_min: float = 15.0
+    mtbf_h: float = 0.0                  # tempo médio entre falhas (h de produção); 0 = sem falhas
+    mttr_min: float = 45.0               # tempo médio de reparo
+
+
+@dataclass(frozen=True)
+class RegimeLinha:
+    """Regime permanente da máquina na velocidade máxima possível."""
+
+    areas_mm2: np.ndarray        # área após cada fieira
+    velocidades: np.ndarray      # m/s de cada cabrestante
+    utilizacao: np.ndarray       # fração do limite (rotação ou potência) de cada cabrestante
+    gargalo: int                 # passe (1 a n) que limita a máquina
+    taxa_kg_h: float             # produção nominal, sem paradas
+
+    @property
+    def velocidade_final(self):
+        return float(self.velocidades[-1])
+
+
+def regime_linha(linha):
+    """Velocidades dos cabrestantes, gargalo e produção nominal (kg/h) da linha."""
+    resultado = calcular_esquema(linha.reducoes_pct, linha.valor_inicial)
+    if np.isnan(resultado.valores_iniciais).any():
+        raise ValueError("A simulação da linha exige valor inicial.")
+    if resultado.num_passes == 0:
+        raise ValueError("O esquema não tem passes.")
+    valores = resultado.valores[0]
+    areas = valores if linha.grandeza == GRANDEZA_AREA else diametro_para_area(valores)
+    if not (areas > 0.0).all():
+        raise ValueError("Reduções de 100% não são possíveis em uma linha.")
+
+    # v_final máxima permitida por cada cabrestante: vₖ = v_f · A_f / Aₖ ≤ v_max
+    relacao = areas[-1] / areas
+    limites = linha.velocidade_max / relacao
+    potencia_ref = None
+    if linha.potencia_max_kW > 0.0:
+        if linha.material is None:
+            raise ValueError("O limite de potência exige o material.")
+        from esforcos import calcular_esforcos
+
+        # Potência é proporcional à velocidade: referência em v_final = 1 m/s
+        potencia_ref = calcular_esforcos(
+            [linha.reducoes_pct], linha.valor_inicial, linha.grandeza, linha.material,
+            angulo_graus=linha.angulo_graus, atrito=linha.atrito, velocidade_final=1.0,
+        ).potencia_kW[0]
+        with np.errstate(divide="ignore"):
+            limites = np.minimum(limites, np.where(potencia_ref > 0.0, linha.potencia_max_kW / potencia_ref, np.inf))
+
+    gargalo = int(np.argmin(limites))
+    v_final = float(limites[gargalo])
+    velocidades = v_final * relacao
+    utilizacao = velocidades / linha.velocidade_max
+    if potencia_ref is not None:
+        utilizacao = np.maximum(utilizacao, potencia_ref * v_final / linha.potencia_max_kW)
+    taxa = linha.densidade * areas[-1] * 1e-6 * v_final * 3600.0
+    return RegimeLinha(areas_mm2=areas, velocidades=velocidades, utilizacao=utilizacao,
+                       gargalo=gargalo + 1, taxa_kg_h=taxa)
+
+
+@dataclass
+class ResultadoLinha:
+    """Totais de uma linha no horizonte simulado (tempos em horas)."""
+
+    nome: str
+    regime: RegimeLinha
+    horas: float
+    massa_kg: float = 0.0
+    bobinas: int = 0
+    falhas: int = 0
+    trocas_fieira: np.ndarray = None     # trocas por passe
+    produzindo_h: float = 0.0
+    troca_bobina_h: float = 0.0
+    troca_fieira_h: float = 0.0
+    reparo_h: float = 0.0
+    espera_equipe_h: float = 0.0
+
+    @property
+    def producao_kg_h(self):
+        """Produção média no horizonte, com paradas."""
+        return self.massa_kg / self.horas if self.horas else 0.0
+
+    @property
+    def disponibilidade(self):
+        return self.produzindo_h / self.horas if self.horas else 0.0
+
+
+class _EstadoLinha:
+    """Estado corrente de uma linha durante a simulação."""
+
+    def __init__(self, linha, rng):
+        self.linha = linha
+        self.rng = rng
+        self.regime = regime_linha(linha)
+        self.km_h = self.regime.velocidades * 3.6  # km de fio por hora em cada fieira
+        self.resultado = ResultadoLinha(linha.nome, self.regime, 0.0,
+                                        trocas_fieira=np.zeros(self.km_h.size, dtype=np.int64))
+        self.massa_restante = linha.massa_bobina_kg
+        self.vida_restante = np.full(self.km_h.size, float(linha.vida_fieira_km))
+        self.ate_falha = self._sortear_falha()
+        self.inicio_trecho = None
+        self.motivo = None
+        self.inicio_espera = None
+
+    def _sortear_falha(self):
+        return self.rng.exponential(self.linha.mtbf_h) if self.linha.mtbf_h > 0.0 else math.inf
+
+    def duracao_trecho(self):
+        """Horas até a próxima parada (fim da bobina, fim de vida de fieira ou falha) e o motivo."""
+        opcoes = (
+            (self.massa_restante / self.regime.taxa_kg_h, BOBINA),
+            (float(np.min(self.vida_restante / self.km_h)), FIEIRA),
+            (self.ate_falha, FALHA),
+        )
+        return min(opcoes, key=lambda o: o[0])
+
+    def produzir(self, horas):
+        """Avança `horas` de produção contínua."""
+        self.resultado.produzindo_h += horas
+        massa = min(self.regime.taxa_kg_h * horas, self.massa_restante)
+        self.resultado.massa_kg += massa
+        self.massa_restante -= massa
+        self.vida_restante -= self.km_h * horas
+        self.ate_falha -= horas
+
+    def parada(self, motivo):
+        """Duração (h) da parada e restauração do estado ao fim dela."""
+        linha = self.linha
+        if motivo == BOBINA:
+            self.resultado.bobinas += 1
+            self.massa_restante = linha.massa_bobina_kg
+            return linha.troca_bobina_min / 60.0
+        if motivo == FIEIRA:
+            gastas = self.vida_restante <= 1e-9 * linha.vida_fieira_km
+            self.resultado.trocas_fieira += gastas
+            self.vida_restante[gastas] = linha.vida_fieira_km
+            return linha.troca_fieira_min / 60.0
+        self.resultado.falhas += 1
+        self.ate_falha = self._sortear_falha()
+        return self.rng.exponential(linha.mttr_min / 60.0)
+
+
+def _acumular_parada(resultado, motivo, horas):
+    if motivo == BOBINA:
+        resultado.troca_bobina_h += horas
+    elif motivo == FIEIRA:
+        resultado.troca_fieira_h += horas
+    else:
+        resultado.reparo_h += horas
+
+
+def simular_linhas(linhas, horas=HORAS_MES, equipes=0, semente=None):
+    """
+    Simula as linhas por `horas` e devolve um `ResultadoLinha` por linha.
+
+    `equipes` limita quantas trocas de fieira e reparos ocorrem ao mesmo tempo
+    entre todas as linhas (0 = sem limite); as demais esperam em fila.
+    """
+    rng = np.random.default_rng(semente)
+    estados = [_EstadoLinha(linha, rng) for linha in linhas]
+    eventos = []
+    contador = itertools.count()  # desempate estável de eventos simultâneos
+    livres = equipes if equipes > 0 else math.inf
+    fila = deque()
+
+    def agendar(t, tipo, i, duracao=0.0):
+        heapq.heappush(eventos, (t + duracao, next(contador), tipo, i))
+
+    def iniciar_manutencao(t, i):
+        estado = estados[i]
+        duracao = estado.parada(estado.motivo)
+        _acumular_parada(estado.resultado, estado.motivo, max(min(duracao, horas - t), 0.0))
+        agendar(t, _FIM_MANUTENCAO, i, duracao)
+
+    for i in range(len(estados)):
+        agendar(0.0, _INICIO, i)
+
+    while eventos and eventos[0][0] < horas:
+        t, _, tipo, i = heapq.heappop(eventos)
+        estado = estados[i]
+        if tipo == _INICIO:
+            duracao, estado.motivo = estado.duracao_trecho()
+            estado.inicio_trecho = t
+            agendar(t, _FIM_TRECHO, i, duracao)
+        elif tipo == _FIM_TRECHO:
+            estado.produzir(t - estado.inicio_trecho)
+            estado.inicio_trecho = None
+            if estado.motivo == BOBINA:
+                duracao = estado.parada(BOBINA)
+                _acumular_parada(estado.resultado, BOBINA, min(duracao, horas - t))
+                agendar(t, _INICIO, i, duracao)
+            elif livres > 0:
+                livres -= 1
+                iniciar_manutencao(t, i)
+            else:
+                estado.inicio_espera = t
+                fila.append(i)
+        else:  # fim de troca de fieira ou reparo: libera a equipe
+            livres += 1
+            agendar(t, _INICIO, i)
+            if fila:
+                j = fila.popleft()
+                estados[j].resultado.espera_equipe_h += t - estados[j].inicio_espera
+                estados[j].inicio_espera = None
+                livres -= 1
+                iniciar_manutencao(t, j)
+
+    # Trechos em andamento e esperas abertas no fim do horizonte
+    for estado in estados:
+        if estado.inicio_trecho is not None:
+            estado.produzir(horas - estado.inicio_trecho)
+        if estado.inicio_espera is not None:
+            estado.resultado.espera_equipe_h += horas - estado.inicio_espera
+        estado.resultado.horas = horas
+    return [estado.resultado for estado in estados]
+
+
+def tabela_resultados(resultados):
+    """Resumo (pandas) por linha: produção, disponibilidade e tempos de parada."""
+    import pandas as pd
+
+    return pd.DataFrame([{
+        "Linha": r.nome,
+        "Gargalo (passe)": r.regime.gargalo,
+        "Velocidade final (m/s)": r.regime.velocidade_final,
+        "Nominal (kg/h)": r.regime.taxa_kg_h,
+        "Média (kg/h)": r.producao_kg_h,
+        "Produção (t)": r.massa_kg / 1000.0,
+        "Disponibilidade (%)": r.disponibilidade * 100.0,
+        "Bobinas": r.bobinas,
+        "Trocas de fieira": int(r.trocas_fieira.sum()),
+        "Falhas": r.falhas,
+        "Troca de bobina (h)": r.troca_bobina_h,
+        "Troca de fieira (h)": r.troca_fieira_h,
+        "Reparo (h)": r.reparo_h,
+        "Espera por equipe (h)": r.espera_equipe_h,
+    } for r in resultados])
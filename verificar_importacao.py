@@ -0,0 +1,72 @@
+"""
+Verifica o orçamento de tempo de importação do núcleo de cálculo.
+
+Cada módulo é importado em um interpretador novo (várias vezes, vale o menor
+tempo) e não pode carregar pandas, Streamlit ou pyarrow na importação.
+Pode ser executado de qualquer diretório (os módulos são importados a partir
+da pasta deste arquivo). É o que faz valer o orçamento: o CI o executa como
+um passo próprio, que falha quando o script sai com código 1 (algum limite
+excedido):
+
+    python verificar_importacao.py            # orçamentos padrão
+    python verificar_importacao.py --fator 2  # máquina mais lenta: orçamentos × 2
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Módulo -> tempo máximo de importação (ms), medido a frio em processo novo
+ORCAMENTOS_MS = {
+    "calculo_bitola": 250.0,
+    "otimizador": 100.0,
+    "fieiras": 250.0,
+    "monte_carlo": 250.0,
+    "api_http": 300.0,
+}
+MODULOS_PROIBIDOS = ("pandas", "streamlit", "pyarrow")
+
+_MEDICAO = """
+import json, sys, time
+t = time.perf_counter()
+import {modulo}
+ms = (time.perf_counter() - t) * 1000.0
+print(json.dumps({{"ms": ms, "carregados": [m for m in {proibidos!r} if m in sys.modules]}}))
+"""
+
+
+def medir(modulo, repeticoes=5):
+    """Menor tempo de importação (ms) e módulos proibidos carregados."""
+    melhor, carregados = float("inf"), []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, "-c", _MEDICAO.format(modulo=modulo, proibidos=MODULOS_PROIBIDOS)],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        dados = json.loads(saida.stdout)
+        melhor = min(melhor, dados["ms"])
+        carregados = dados["carregados"]
+    return melhor, carregados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fator", type=float, default=1.0, help="Multiplicador dos orçamentos")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    falhas = 0
+    for modulo, orcamento in ORCAMENTOS_MS.items():
+        ms, carregados = medir(modulo, args.repeticoes)
+        limite = orcamento * args.fator
+        ok = ms <= limite and not carregados
+        falhas += not ok
+        extra = f" (carregou {', '.join(carregados)})" if carregados else ""
+        print(f"{'OK   ' if ok else 'FALHA'} {modulo:<16} {ms:7.1f} ms / {limite:.0f} ms{extra}")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())